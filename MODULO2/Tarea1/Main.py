@@ -2,9 +2,13 @@ from RecocidoSimulado import RecocidoSimulado
 from DatosRutas import DatosRutas
 
 class SimuladorRutas:
-    def __init__(self, ruta_distancias, ruta_combustible, ruta_ubicaciones, num_vehiculos=10):
+    def __init__(self, ruta_distancias, ruta_combustible, ruta_ubicaciones, num_vehiculos=10,
+                 num_reinicios=1, workers=None):
         self.datos = DatosRutas(ruta_distancias, ruta_combustible, ruta_ubicaciones)
         self.num_vehiculos = num_vehiculos
+        # Con más de un reinicio se corren cadenas independientes en paralelo (workers procesos)
+        self.num_reinicios = num_reinicios
+        self.workers = workers
         self.centros = list(range(1, num_vehiculos + 1))
         self.rutas_iniciales = None
         self.recocido = None
@@ -23,7 +27,16 @@ class SimuladorRutas:
             self.rutas_iniciales
         )
 
-        self.resultado_rutas, self.costo_final = self.recocido.recocidoSimulado()
+        if self.num_reinicios > 1:
+            lista_rutas = [self.rutas_iniciales] + [
+                self.datos.inicializar_rutas(self.num_vehiculos, self.centros)
+                for _ in range(self.num_reinicios - 1)
+            ]
+            self.resultado_rutas, self.costo_final = self.recocido.recocido_multistart(
+                lista_rutas, workers=self.workers
+            )
+        else:
+            self.resultado_rutas, self.costo_final = self.recocido.recocidoSimulado()
         self.mostrar_resultados()
 
     def mostrar_resultados(self):
@@ -1,97 +1,221 @@
 import numpy as np
 import math
+from multiprocessing import Pool
+
+try:
+    from numba import njit
+except ImportError:
+    # Sin numba los kernels se ejecutan como Python normal (mismo resultado, más lento)
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda funcion: funcion
+
+
+@njit(cache=True)
+def _barrido_metropolis(C, rutas, longitudes, mejor, T, pares, aleatorios,
+                        costo_actual, costo_mejor, sin_mejora):
+    """
+    Ejecuta en código nativo las iteraciones de Metropolis de una temperatura.
+
+    Las rutas van en una matriz int32 (num_vehiculos x max_len) con nodos desde 0,
+    rellenada al final; longitudes indica cuántos nodos válidos tiene cada fila.
+    Cada paso intercambia una tienda entre dos rutas distintas, evalúa solo los
+    4 tramos afectados y acepta con el criterio de Metropolis. rutas y mejor se
+    modifican en su lugar. Devuelve (costo_actual, costo_mejor, sin_mejora).
+
+    Los números aleatorios llegan ya sorteados, una fila por iteración:
+    - pares[k] = (r1, r2') con r1 en [0, num_rutas) y r2' en [0, num_rutas - 1),
+      que se desplaza para que las dos rutas siempre sean distintas.
+    - aleatorios[k] = (u_i, u_j, u_aceptar), uniformes en [0, 1).
+    """
+    for k in range(pares.shape[0]):
+        r1 = pares[k, 0]
+        r2 = pares[k, 1]
+        if r2 >= r1:
+            r2 += 1
+
+        n1 = longitudes[r1]
+        n2 = longitudes[r2]
+        hay_movimiento = n1 > 2 and n2 > 2
+        i = j = a = b = 0
+        delta = 0.0
+
+        if hay_movimiento:
+            i = 1 + int(aleatorios[k, 0] * (n1 - 2))
+            j = 1 + int(aleatorios[k, 1] * (n2 - 2))
+            a = rutas[r1, i]
+            b = rutas[r2, j]
+            p1, s1 = rutas[r1, i - 1], rutas[r1, i + 1]
+            p2, s2 = rutas[r2, j - 1], rutas[r2, j + 1]
+            delta = ((C[p1, b] + C[b, s1] + C[p2, a] + C[a, s2])
+                     - (C[p1, a] + C[a, s1] + C[p2, b] + C[b, s2]))
+
+        if delta < 0 or aleatorios[k, 2] < math.exp(-delta / T):
+            if hay_movimiento:
+                rutas[r1, i] = b
+                rutas[r2, j] = a
+            costo_actual += delta
+            if costo_actual < costo_mejor:
+                mejor[:, :] = rutas
+                costo_mejor = costo_actual
+                sin_mejora = 0
+            else:
+                sin_mejora += 1
+
+    return costo_actual, costo_mejor, sin_mejora
+
+
+@njit(cache=True)
+def _costo_total(C, rutas, longitudes):
+    """Costo completo de las rutas en formato matriz (nodos desde 0)."""
+    total = 0.0
+    for k in range(rutas.shape[0]):
+        for t in range(longitudes[k] - 1):
+            total += C[rutas[k, t], rutas[k, t + 1]]
+    return total
+
+
+def _ejecutar_cadena(args):
+    """
+    Corre una cadena de recocido independiente (usada por recocido_multistart).
+
+    Está a nivel de módulo para que multiprocessing la pueda serializar; solo
+    recibe matrices, rutas y parámetros, nunca el objeto completo.
+    """
+    distancias, combustible, rutas_iniciales, parametros, semilla = args
+    recocido = RecocidoSimulado(distancias, combustible, rutas_iniciales,
+                                semilla=semilla, verbose=False, **parametros)
+    return recocido.recocidoSimulado()
+
 
 class RecocidoSimulado:
     def __init__(self, distancias, combustible, rutas_iniciales,
-                 T_inicial=100, T_min=0.01, alpha=0.995, iteraciones=200):
+                 T_inicial=100, T_min=0.01, alpha=0.995, iteraciones=200,
+                 peso_distancia=1.0, peso_combustible=1.0, epsilon=0.1, semilla=None,
+                 max_recalentamientos=20, verbose=True):
         self.distancias = distancias
         self.combustible = combustible
-        self.rutas = rutas_iniciales
+        # Las rutas se guardan como arreglos de NumPy para no reconstruirlos en cada evaluación
+        self.rutas = [np.asarray(ruta, dtype=np.intp) for ruta in rutas_iniciales]
+        self.T_inicial = T_inicial
         self.T = T_inicial
         self.T_min = T_min
+        # Tope de recalentamientos para que el ciclo siempre termine
+        self.max_recalentamientos = max_recalentamientos
+        self.verbose = verbose
         self.alpha = alpha
         self.iteraciones = iteraciones
+        self.rng = np.random.default_rng(semilla)
+        self.C = None
+        self.pesos = None
+        self.fijar_pesos(peso_distancia, peso_combustible, epsilon)
 
-    def calcular_costo(self, rutas, alpha=1.0, beta=1.0, epsilon=0.1):
+    def fijar_pesos(self, peso_distancia=1.0, peso_combustible=1.0, epsilon=0.1):
         """
-        Calcula el costo total de un conjunto de rutas considerando:
-        - Peso de la distancia (alpha)
-        - Peso del combustible (beta)
+        Precalcula la matriz de costo combinada de cada tramo considerando:
+        - Peso de la distancia (peso_distancia)
+        - Peso del combustible (peso_combustible)
         - Penalización adicional por tramos largos/costosos (epsilon)
-    
+
         Este enfoque permite que swaps que reduzcan tramos muy costosos
-        tengan un impacto más visible en el costo total.
+        tengan un impacto más visible en el costo total. Como el costo es
+        lineal, se combina una sola vez y cada tramo se lee con un único acceso.
         """
+        self.pesos = (peso_distancia, peso_combustible, epsilon)
+        C = ((peso_distancia + epsilon) * self.distancias
+             + (peso_combustible + epsilon) * self.combustible)
+        # Se conserva el tipo de las matrices de entrada (float32 desde DatosRutas)
+        self.C = np.ascontiguousarray(C, dtype=np.result_type(self.distancias, self.combustible))
+
+    def calcular_costo(self, rutas):
+        """Calcula el costo total de un conjunto de rutas con la matriz combinada C."""
         costo_total = 0
 
         for ruta in rutas:
-            origenes = np.array(ruta[:-1]) - 1
-            destinos = np.array(ruta[1:]) - 1
-
-            for o, d in zip(origenes, destinos):
-                distancia = self.distancias[o, d]
-                combustible = self.combustible[o, d]
-
-                costo_tramo = alpha * distancia + beta * combustible
+            ruta = np.asarray(ruta, dtype=np.intp)
 
-                costo_tramo += epsilon * (distancia + combustible)
-
-                costo_total += costo_tramo
+            # Suma vectorizada de todos los tramos de la ruta (acumulada en float64)
+            costo_total += self.C[ruta[:-1] - 1, ruta[1:] - 1].sum(dtype=np.float64)
 
         return costo_total
 
-    def generar_vecino(self, rutas):
-        """Genera un vecino intercambiando una tienda entre dos rutas (misma lógica, distinto enfoque)."""
-        nuevas_rutas = [r[:] for r in rutas]
-
-        indices = np.arange(len(nuevas_rutas))
-        np.random.shuffle(indices)
-        r1, r2 = indices[:2]
-
-        ruta1, ruta2 = nuevas_rutas[r1], nuevas_rutas[r2]
-
-        if len(ruta1) > 2 and len(ruta2) > 2:
-            i = np.random.randint(1, len(ruta1) - 1)
-            j = np.random.randint(1, len(ruta2) - 1)
-
-            temp = ruta1[i]
-            ruta1[i] = ruta2[j]
-            ruta2[j] = temp
-
-            nuevas_rutas[r1], nuevas_rutas[r2] = ruta1, ruta2
-
-        return nuevas_rutas
+    def _a_matriz(self, rutas):
+        """Empaqueta las rutas (nodos desde 1) en la matriz int32 que usan los kernels."""
+        longitudes = np.array([len(ruta) for ruta in rutas], dtype=np.int32)
+        matriz = np.full((len(rutas), longitudes.max()), -1, dtype=np.int32)
+        for k, ruta in enumerate(rutas):
+            matriz[k, :len(ruta)] = np.asarray(ruta) - 1
+        return matriz, longitudes
 
     def recocidoSimulado(self):
         """Ejecuta el proceso de recocido."""
-        actual = self.rutas
-        mejor = self.rutas
-        costo_actual = self.calcular_costo(actual)
+        actual, longitudes = self._a_matriz(self.rutas)
+        mejor = actual.copy()
+        costo_actual = _costo_total(self.C, actual, longitudes)
         costo_mejor = costo_actual
         sin_mejora = 0
+        num_rutas = len(longitudes)
+        recalentamientos = 0
 
         while self.T > self.T_min:
-            for _ in range(self.iteraciones):
-                vecino = self.generar_vecino(actual)
-                costo_vecino = self.calcular_costo(vecino)
-                delta = costo_vecino - costo_actual
-
-                if delta < 0 or np.random.rand() < math.exp(-delta / self.T):
-                    actual = vecino
-                    costo_actual = costo_vecino
-                    if costo_actual < costo_mejor:
-                        mejor = actual
-                        costo_mejor = costo_actual
-                        sin_mejora = 0
-                    else:
-                        sin_mejora += 1
-
-            if sin_mejora > 500:
-                self.T *= 0.9
+            # Se sortean de una vez todos los aleatorios de la temperatura
+            pares = self.rng.integers(0, [num_rutas, num_rutas - 1],
+                                      size=(self.iteraciones, 2), dtype=np.int32)
+            aleatorios = self.rng.random((self.iteraciones, 3))
+
+            costo_actual, costo_mejor, sin_mejora = _barrido_metropolis(
+                self.C, actual, longitudes, mejor, self.T, pares, aleatorios,
+                costo_actual, costo_mejor, sin_mejora
+            )
+
+            # Recalcular el costo completo una vez por temperatura corrige
+            # el error de punto flotante acumulado por los deltas
+            costo_actual = _costo_total(self.C, actual, longitudes)
+
+            if sin_mejora > 500 and recalentamientos < self.max_recalentamientos:
+                # Estancado: se recalienta (sube T) para escapar del mínimo local,
+                # sin pasar de la temperatura inicial
+                self.T = min(self.T_inicial, self.T / 0.9)
+                recalentamientos += 1
                 sin_mejora = 0
             else:
                 self.T *= self.alpha
 
-            print(f"Temperatura: {self.T:.4f} | Mejor Costo: {costo_mejor:.2f}")
+            if self.verbose:
+                print(f"Temperatura: {self.T:.4f} | Mejor Costo: {costo_mejor:.2f}")
+
+        rutas_mejor = [mejor[k, :longitudes[k]] + 1 for k in range(len(longitudes))]
+        return rutas_mejor, costo_mejor
 
-        return mejor, costo_mejor
\ No newline at end of file
+    def recocido_multistart(self, lista_rutas_iniciales, workers=None, semilla=None):
+        """
+        Ejecuta una cadena de recocido independiente por cada conjunto de rutas
+        iniciales, repartidas entre `workers` procesos, y devuelve la mejor
+        (rutas, costo). Reiniciar desde varios puntos reduce el riesgo de
+        quedar atrapado en un mínimo local.
+
+        Todas las cadenas usan los mismos parámetros que esta instancia; las
+        semillas se derivan de `semilla` para que cada cadena sea distinta.
+        """
+        peso_distancia, peso_combustible, epsilon = self.pesos
+        parametros = dict(
+            T_inicial=self.T_inicial, T_min=self.T_min, alpha=self.alpha,
+            iteraciones=self.iteraciones, peso_distancia=peso_distancia,
+            peso_combustible=peso_combustible, epsilon=epsilon,
+            max_recalentamientos=self.max_recalentamientos,
+        )
+        semillas = np.random.SeedSequence(semilla).spawn(len(lista_rutas_iniciales))
+        tareas = [(self.distancias, self.combustible, rutas, parametros, s)
+                  for rutas, s in zip(lista_rutas_iniciales, semillas)]
+
+        if workers == 1:
+            resultados = [_ejecutar_cadena(tarea) for tarea in tareas]
+        else:
+            with Pool(workers) as pool:
+                resultados = pool.map(_ejecutar_cadena, tareas)
+
+        for k, (_, costo) in enumerate(resultados, 1):
+            if self.verbose:
+                print(f"Reinicio {k:02d} | Costo: {costo:.2f}")
+        return min(resultados, key=lambda resultado: resultado[1])
@@ -2,6 +2,8 @@
 # OPTIMIZACIÓN DE COLOCACIÓN DE SENSORES DE HUMEDAD CON PSO
 # ==========================================================
 
+import os
+
 import numpy as np
 import matplotlib.pyplot as plt
 import pyswarms as ps
@@ -18,14 +20,14 @@ class CampoAgricola:
         np.random.seed(semilla)
         self.tamaño = tamaño
         self.topografia = np.random.normal(loc=25, scale=5, size=(tamaño, tamaño))
-        self.humedad = np.random.uniform(low=0.2, high=0.9, size=(tamaño, tamaño))
-        self.suelo = np.random.uniform(low=0.5, high=1.0, size=(tamaño, tamaño))
-    
-    def obtener_valores(self, x, y):
-        """Devuelve humedad y calidad del suelo en una posición (x, y)."""
-        x = int(np.clip(x, 0, self.tamaño - 1))
-        y = int(np.clip(y, 0, self.tamaño - 1))
-        return self.humedad[x][y], self.suelo[x][y]
+        self.humedad = np.ascontiguousarray(
+            np.random.uniform(low=0.2, high=0.9, size=(tamaño, tamaño)), dtype=np.float32)
+        self.suelo = np.ascontiguousarray(
+            np.random.uniform(low=0.5, high=1.0, size=(tamaño, tamaño)), dtype=np.float32)
+
+        # Tabla plana (tamaño*tamaño, 2) con humedad y suelo juntos: un solo
+        # gather por la celda x*tamaño + y devuelve ambos valores de cada sensor.
+        self._hs = np.stack([self.humedad, self.suelo], axis=-1).reshape(-1, 2)
 
 # ----------------------------------------------------------
 # Función objetivo (fitness)
@@ -40,35 +42,42 @@ def evaluar_configuracion(posiciones, campo, n_sensores):
     Penaliza:
         - Sensores muy cercanos entre sí
     """
-    fitness = []
-    for p in posiciones:
-        coords = p.reshape(n_sensores, 2)
-
-        distancias = []
-        for i in range(n_sensores):
-            for j in range(i+1, n_sensores):
-                d = np.linalg.norm(coords[i] - coords[j])
-                distancias.append(d)
-        penalizacion_cercania = np.sum(np.exp(-np.array(distancias)/10))  # penaliza cercanos
-
-        humedad_total = 0
-        suelo_total = 0
-        for (x, y) in coords:
-            h, s = campo.obtener_valores(x, y)
-            humedad_total += h
-            suelo_total += s
-
-        var_humedad = np.var([campo.obtener_valores(x, y)[0] for x, y in coords])
-
-        score = (humedad_total + var_humedad + suelo_total) - 0.4 * penalizacion_cercania
-        fitness.append(-score)  
-    return np.array(fitness)
+    P = posiciones.shape[0]
+    tamaño = campo.tamaño
+    coords = posiciones.reshape(P, n_sensores, 2)
+
+    # Penalización por cercanía: distancias entre todos los pares de sensores
+    # de cada partícula, calculadas de una vez con broadcasting.
+    diff = coords[:, :, None, :] - coords[:, None, :, :]
+    d = np.sqrt((diff ** 2).sum(axis=-1))
+    iu, ju = np.triu_indices(n_sensores, 1)
+    penalizacion_cercania = np.exp(-d[:, iu, ju] / 10).sum(axis=1)  # penaliza cercanos
+
+    # Humedad y suelo en la celda de cada sensor: la posición se trunca a la
+    # celda entera y se recorta a los bordes del campo.
+    celdas = np.clip(coords.astype(np.int64), 0, tamaño - 1)
+    hs = campo._hs[celdas[..., 0] * tamaño + celdas[..., 1]]
+    h, s = hs[..., 0], hs[..., 1]
+
+    score = (h.sum(axis=1) + h.var(axis=1) + s.sum(axis=1)) - 0.4 * penalizacion_cercania
+    return -score
 
 # ----------------------------------------------------------
 # Función principal
 # ----------------------------------------------------------
 
-def optimizar_sensores():
+def optimizar_sensores(n_procesos=1):
+    """
+    Ejecuta el PSO y grafica la mejor configuración encontrada.
+
+    n_procesos: número de procesos para evaluar las partículas en paralelo
+    (None = todos los núcleos). Con 1 se evalúa en el proceso actual, que es
+    lo más rápido mientras la función objetivo sea barata; conviene subirlo
+    con enjambres grandes o muchos sensores.
+    """
+    if n_procesos is None:
+        n_procesos = os.cpu_count()
+
     campo = CampoAgricola(tamaño=100)
 
     N_SENSORES = 10
@@ -83,9 +92,6 @@ def optimizar_sensores():
         'w': 0.7
     }
 
-    def fitness_wrapper(pos):
-        return evaluar_configuracion(pos, campo, N_SENSORES)
-
     optimizer = ps.single.GlobalBestPSO(
         n_particles=50,
         dimensions=DIMENSIONES,
@@ -93,7 +99,16 @@ def optimizar_sensores():
         bounds=BOUNDS
     )
 
-    mejor_costo, mejor_pos = optimizer.optimize(fitness_wrapper, iters=150)
+    # pyswarms reparte el enjambre entre un Pool de procesos. La función objetivo
+    # debe poder serializarse, por eso se pasa evaluar_configuracion (función de
+    # módulo) y el campo como argumentos en lugar de un closure.
+    mejor_costo, mejor_pos = optimizer.optimize(
+        evaluar_configuracion,
+        iters=150,
+        n_processes=n_procesos if n_procesos > 1 else None,
+        campo=campo,
+        n_sensores=N_SENSORES,
+    )
 
     print("\n========== RESULTADOS ==========")
     print(f"Mejor costo encontrado: {mejor_costo:.4f}")
@@ -1,10 +1,19 @@
 from __future__ import annotations
-import random
 import math
 from typing import List, Tuple
 
+import numpy as np
+from scipy.spatial.distance import pdist, squareform
+
 class Ciudad:
-    """Representa una ciudad con coordenadas (x, y)."""
+    """
+    Representa una ciudad con coordenadas (x, y).
+
+    Solo se usa en la entrada y salida del AG; internamente las ciudades son
+    índices sobre los arreglos xs/ys y la matriz de distancias.
+    """
+    __slots__ = ("x", "y", "name")
+
     def __init__(self, x: float, y: float, name: str = None):
         self.x = float(x)
         self.y = float(y)
@@ -19,22 +28,30 @@ class Ciudad:
     def __repr__(self):
         return f"{self.name}"
 
+def coordenadas(ciudades: List[Ciudad]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pasa la lista de ciudades a estructura de arreglos: (xs, ys)."""
+    xs = np.fromiter((c.x for c in ciudades), dtype=float, count=len(ciudades))
+    ys = np.fromiter((c.y for c in ciudades), dtype=float, count=len(ciudades))
+    return xs, ys
+
+def precompute_distance_matrix(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Matriz D[i, j] con la distancia Euclidiana entre todas las ciudades."""
+    return squareform(pdist(np.column_stack([xs, ys])))
+
 class Aptitud:
     """Calcula distancia de ruta y aptitud."""
-    def __init__(self, route: List[Ciudad]):
+    def __init__(self, route: np.ndarray, D: np.ndarray):
         self.route = route
+        self.D = D
         self._distancia = None
         self._fitness = None
 
     def distancia(self) -> float:
         """Devuelve la distancia total del ciclo (vuelta al inicio)."""
         if self._distancia is None:
-            total = 0.0
-            for i in range(len(self.route)):
-                start = self.route[i]
-                end = self.route[(i + 1) % len(self.route)]
-                total += start.distancia(end)
-            self._distancia = total
+            r = self.route
+            # Tramos consecutivos más el regreso de la última ciudad a la primera
+            self._distancia = float(self.D[r[:-1], r[1:]].sum() + self.D[r[-1], r[0]])
         return self._distancia
 
     def fitness(self) -> float:
@@ -44,17 +61,17 @@ class Aptitud:
             self._fitness = 1.0 / d if d > 0 else float("inf")
         return self._fitness
 
-def crear_ruta(ciudades: List[Ciudad]) -> List[Ciudad]:
-    """Crear una ruta aleatoria (permutación de ciudades)."""
-    return random.sample(ciudades, len(ciudades))
+def crear_ruta(n_ciudades: int) -> np.ndarray:
+    """Crear una ruta aleatoria (permutación de los índices de las ciudades)."""
+    return np.random.permutation(n_ciudades).astype(np.int32)
 
-def poblacion_inicial(tamano_poblacion: int, ciudades: List[Ciudad]) -> List[List[Ciudad]]:
+def poblacion_inicial(tamano_poblacion: int, n_ciudades: int) -> List[np.ndarray]:
     """Genera una población inicial de rutas."""
-    return [crear_ruta(ciudades) for _ in range(tamano_poblacion)]
+    return [crear_ruta(n_ciudades) for _ in range(tamano_poblacion)]
 
-def rank_rutas(poblacion: List[List[Ciudad]]) -> List[Tuple[int, float]]:
+def rank_rutas(poblacion: List[np.ndarray], D: np.ndarray) -> List[Tuple[int, float]]:
     """Devuelve lista de pares (index, fitness) ordenada por fitness descendente."""
-    fitness_results = [(i, Aptitud(route).fitness()) for i, route in enumerate(poblacion)]
+    fitness_results = [(i, Aptitud(route, D).fitness()) for i, route in enumerate(poblacion)]
     return sorted(fitness_results, key=lambda x: x[1], reverse=True)
 
 def seleccion(pop_ranked: List[Tuple[int, float]], tam_elite: int) -> List[int]:
@@ -63,73 +80,78 @@ def seleccion(pop_ranked: List[Tuple[int, float]], tam_elite: int) -> List[int]:
     for i in range(tam_elite):
         resultados.append(pop_ranked[i][0])
 
-    fitness_sum = sum([f for _, f in pop_ranked])
-    cumulative = []
-    acc = 0.0
-    for _, f in pop_ranked:
-        acc += f
-        cumulative.append(acc / fitness_sum)
-
-    for _ in range(len(pop_ranked) - tam_elite):
-        r = random.random()
-        for idx, cum_prob in enumerate(cumulative):
-            if r <= cum_prob:
-                resultados.append(pop_ranked[idx][0])
-                break
+    # Ruleta vectorizada: todas las tiradas se ubican en la acumulada con búsqueda binaria
+    fitness = np.array([f for _, f in pop_ranked])
+    cumulative = np.cumsum(fitness) / fitness.sum()
+    picks = np.searchsorted(cumulative, np.random.random(len(pop_ranked) - tam_elite))
+    # Por redondeo la acumulada puede terminar apenas debajo de 1.0
+    picks = np.minimum(picks, len(pop_ranked) - 1)
+
+    resultados.extend(pop_ranked[idx][0] for idx in picks)
     return resultados
 
-def pool_de_apareamiento(poblacion: List[List[Ciudad]], resultados: List[int]) -> List[List[Ciudad]]:
+def pool_de_apareamiento(poblacion: List[np.ndarray], resultados: List[int]) -> List[np.ndarray]:
     """Construye el pool de apareamiento usando los índices seleccionados."""
     return [poblacion[i] for i in resultados]
 
-def crossover_ordenado(parent1: List[Ciudad], parent2: List[Ciudad]) -> List[Ciudad]:
+def crossover_ordenado(parent1: np.ndarray, parent2: np.ndarray) -> np.ndarray:
     """
     Realiza crossover ordenado entre dos padres para producir un hijo.
     """
-    child = [None] * len(parent1)
-    start = random.randint(0, len(parent1) - 1)
-    end = random.randint(start, len(parent1) - 1)
-
-    for i in range(start, end + 1):
-        child[i] = parent1[i]
-
-    p2_idx = 0
-    for i in range(len(child)):
-        if child[i] is None:
-            while parent2[p2_idx] in child:
-                p2_idx += 1
-            child[i] = parent2[p2_idx]
-            p2_idx += 1
+    n = len(parent1)
+    child = np.empty(n, dtype=np.int32)
+    start = np.random.randint(0, n)
+    end = np.random.randint(start, n)
+
+    child[start:end + 1] = parent1[start:end + 1]
+
+    # Máscara de ciudades ya copiadas: consulta O(1) en lugar de buscar en el hijo
+    used = np.zeros(n, dtype=bool)
+    used[child[start:end + 1]] = True
+
+    # Los huecos (antes y después del segmento) se llenan con parent2 en orden
+    restantes = parent2[~used[parent2]]
+    child[:start] = restantes[:start]
+    child[end + 1:] = restantes[start:]
     return child
 
-def cruzar_poblacion(matingpool: List[List[Ciudad]], elite_size: int) -> List[List[Ciudad]]:
+def cruzar_poblacion(matingpool: List[np.ndarray], elite_size: int) -> List[np.ndarray]:
     """Genera la próxima generación mediante crossover."""
     children = []
     length = len(matingpool) - elite_size
     for i in range(elite_size):
         children.append(matingpool[i])
 
-    pool = random.sample(matingpool, len(matingpool))
+    pool = [matingpool[k] for k in np.random.permutation(len(matingpool))]
     for i in range(length):
         child = crossover_ordenado(pool[i], pool[len(matingpool) - i - 1])
         children.append(child)
     return children
 
-def mutacion(individual: List[Ciudad], mutation_rate: float) -> List[Ciudad]:
+def mutacion(individual: np.ndarray, mutation_rate: float) -> np.ndarray:
     """Swap mutation: intercambia dos genes con probabilidad mutation_rate por posición."""
-    for swapped in range(len(individual)):
-        if random.random() < mutation_rate:
-            swap_with = random.randint(0, len(individual) - 1)
-            individual[swapped], individual[swap_with] = individual[swap_with], individual[swapped]
+    n = len(individual)
+    # Se sortea de una vez qué posiciones mutan; los swaps se aplican en orden
+    for swapped in np.flatnonzero(np.random.random(n) < mutation_rate):
+        swap_with = np.random.randint(0, n)
+        individual[swapped], individual[swap_with] = individual[swap_with], individual[swapped]
     return individual
 
-def mutar_poblacion(poblacion: List[List[Ciudad]], tasa_mutacion: float) -> List[List[Ciudad]]:
+def mutar_poblacion(poblacion: List[np.ndarray], tasa_mutacion: float) -> List[np.ndarray]:
     """Aplica mutación a toda la población."""
-    return [mutacion(ind[:], tasa_mutacion) for ind in poblacion]  # copiar antes de mutar
+    return [mutacion(ind.copy(), tasa_mutacion) for ind in poblacion]  # copiar antes de mutar
 
-def siguiente_generacion(poblacion_actual: List[List[Ciudad]], tam_elite: int, tasa_mutacion: float) -> List[List[Ciudad]]:
-    """Genera la siguiente generación completa."""
-    pop_ranked = rank_rutas(poblacion_actual)
+def siguiente_generacion(poblacion_actual: List[np.ndarray], tam_elite: int, tasa_mutacion: float,
+                         D: np.ndarray,
+                         pop_ranked: List[Tuple[int, float]] | None = None) -> List[np.ndarray]:
+    """
+    Genera la siguiente generación completa.
+
+    Si ya se tiene el ranking de poblacion_actual se puede pasar en pop_ranked
+    para no volver a evaluar todas las rutas.
+    """
+    if pop_ranked is None:
+        pop_ranked = rank_rutas(poblacion_actual, D)
     selection_results = seleccion(pop_ranked, tam_elite)
     matingpool = pool_de_apareamiento(poblacion_actual, selection_results)
     children = cruzar_poblacion(matingpool, tam_elite)
@@ -143,20 +165,26 @@ def algoritmo_genetico(ciudades: List[Ciudad],
                       generaciones: int = 500,
                       verbose: bool = True) -> Tuple[List[Ciudad], float]:
     """Ejecuta el AG y devuelve la mejor ruta encontrada y su distancia."""
-    pop = poblacion_inicial(tam_poblacion, ciudades)
+    # Internamente las rutas son permutaciones de índices sobre la matriz de distancias
+    xs, ys = coordenadas(ciudades)
+    D = precompute_distance_matrix(xs, ys)
+    pop = poblacion_inicial(tam_poblacion, len(ciudades))
+    # Un solo ranking por generación: se reutiliza para imprimir y para la selección
+    ranked = rank_rutas(pop, D)
     if verbose:
-        initial_distance = 1 / rank_rutas(pop)[0][1]
+        initial_distance = 1 / ranked[0][1]
         print(f"Distancia inicial: {initial_distance:.4f}")
 
     for i in range(generaciones):
-        pop = siguiente_generacion(pop, tam_elite, tasa_mutacion)
+        pop = siguiente_generacion(pop, tam_elite, tasa_mutacion, D, ranked)
+        ranked = rank_rutas(pop, D)
         if verbose and (i + 1) % max(1, generaciones // 30) == 0:
-            best_dist = 1 / rank_rutas(pop)[0][1]
+            best_dist = 1 / ranked[0][1]
             print(f"Generación {i+1} / {generaciones} - Mejor distancia: {best_dist:.4f}")
 
-    best_index = rank_rutas(pop)[0][0]
-    best_route = pop[best_index]
-    best_distance = 1 / rank_rutas(pop)[0][1]
+    best_index = ranked[0][0]
+    best_route = [ciudades[k] for k in pop[best_index]]
+    best_distance = 1 / ranked[0][1]
     if verbose:
         print(f"Distancia final: {best_distance:.4f}")
     return best_route, best_distance
@@ -165,6 +193,7 @@ def algoritmo_genetico(ciudades: List[Ciudad],
 if __name__ == "__main__":
     import random
     random.seed(46)
+    np.random.seed(46)
     ciudades_example = [Ciudad(random.uniform(0,100), random.uniform(0,100), f"C{i}") for i in range(15)]
     best_route, best_dist = algoritmo_genetico(ciudades_example, tam_poblacion=100, tam_elite=20,
                                               tasa_mutacion=0.02, generaciones=200, verbose=True)
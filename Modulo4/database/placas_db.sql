@@ -43,6 +43,7 @@ CREATE TABLE `propietarios` (
 CREATE TABLE `vehiculos` (
   `id_vehiculo` int(11) NOT NULL,
   `placa` varchar(15) NOT NULL,
+  `placa_norm` varchar(15) GENERATED ALWAYS AS (replace(upper(`placa`),' ','')) STORED,
   `marca` varchar(50) NOT NULL,
   `modelo` varchar(50) NOT NULL,
   `anio` year(4) NOT NULL,
@@ -65,6 +66,7 @@ ALTER TABLE `propietarios`
 ALTER TABLE `vehiculos`
   ADD PRIMARY KEY (`id_vehiculo`),
   ADD UNIQUE KEY `placa` (`placa`(10)),
+  ADD KEY `idx_placa_norm` (`placa_norm`),
   ADD KEY `fk_vehiculo_propietario` (`id_propietario`);
 
 --
@@ -3,22 +3,45 @@
 Módulo Db_conector
 
 Encapsula la lógica de conexión a la base de datos MySQL que corre en XAMPP.
-Se utiliza la librería mysql-connector-python para conectarse al servidor,
-ejecutar consultas (SELECT) y operaciones de escritura (INSERT/UPDATE/DELETE).
+Se utiliza la librería mysqlclient (MySQLdb, enlazada a la biblioteca en C
+libmysqlclient) para conectarse al servidor, ejecutar consultas (SELECT) y
+operaciones de escritura (INSERT/UPDATE/DELETE) sobre un pool de conexiones
+reutilizables. Es bastante más rápida que
+mysql-connector-python al leer resultados.
 
 Esta clase se usa en todo el proyecto como "puente" entre Python y la BD.
 """
 
-import mysql.connector
-from mysql.connector import Error
+import queue
+import threading
+from contextlib import contextmanager
+
+import MySQLdb
+import MySQLdb.cursors
+from MySQLdb import Error
+
+try:
+    import aiomysql
+except ImportError:
+    # Sin aiomysql solo están disponibles los métodos síncronos
+    aiomysql = None
+
+# Mensaje cuando se intenta consultar sin pool (antes de connect() o tras close())
+SIN_CONEXION = "No hay conexión a la base de datos. Llama primero a connect()."
+
+# Códigos de error del cliente que indican que se perdió la conexión
+# (2006 server gone away, 2013 y 2055 lost connection)
+CONEXION_PERDIDA = {2006, 2013, 2055}
 
 
 class MySQLDatabase:
     """
     Clase MySQLDatabase
 
-    Responsable de abrir y cerrar la conexión con MySQL, así como ejecutar
-    consultas de lectura y escritura.
+    Administra un pool de conexiones con MySQL y ejecuta consultas de lectura
+    y escritura. Cada consulta toma una conexión del pool, abre su propio
+    cursor y al terminar devuelve la conexión, así no se paga el handshake
+    TCP + autenticación en cada consulta y varios hilos pueden consultar a la vez.
 
     Parámetros del constructor:
     - host: dirección del servidor MySQL, normalmente "localhost" en XAMPP.
@@ -26,6 +49,7 @@ class MySQLDatabase:
     - user: usuario de la base de datos (por ejemplo "root" en XAMPP).
     - password: contraseña del usuario (vacía si no configuraste una).
     - database: nombre de la base de datos donde están las tablas de placas.
+    - pool_size: máximo de conexiones abiertas a la vez (>= número de hilos que consultan).
     """
 
     def __init__(
@@ -35,57 +59,185 @@ class MySQLDatabase:
         user: str = "root",
         password: str = "123",
         database: str = "placas_db",
+        pool_size: int = 8,
     ):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
+        self.pool_size = pool_size
+
+        # El pool se crea cuando se llama a connect()
+        self._pool = None                 # Conexiones libres (LIFO: se reusa la más reciente)
+        self._async_pool = None           # Pool de aiomysql, se crea con connect_async()
+        self._abiertas = 0                # Conexiones creadas que siguen vivas
+        self._lock = threading.Lock()     # Protege el contador de conexiones abiertas
+
+    def _nueva_conexion(self):
+        """Abre una conexión nueva con el servidor MySQL."""
+        return MySQLdb.connect(
+            host=self.host,
+            port=self.port,
+            user=self.user,
+            passwd=self.password,
+            db=self.database,
+            # utf8mb4 igual que las tablas, para no romper acentos en los nombres
+            charset="utf8mb4",
+            # DictCursor hace que el resultado de fetchall() sea una lista de diccionarios
+            # en lugar de tuplas. Es más cómodo porque podemos acceder por nombre de columna.
+            cursorclass=MySQLdb.cursors.DictCursor,
+            # Sin autocommit: las escrituras se confirman explícitamente,
+            # una sola vez por operación o por lote.
+            autocommit=False,
+        )
+
+    def _tomar_conexion(self):
+        """
+        Saca una conexión libre del pool. Si no hay y aún no se llega a
+        pool_size se abre una nueva; si ya están todas en uso se espera.
+        Si close() cierra el pool durante la espera se lanza RuntimeError.
+        """
+        with self._lock:
+            pool = self._pool
+        if pool is None:
+            raise RuntimeError(SIN_CONEXION)
 
-        # Estos atributos se llenan cuando se llama a connect()
-        self.conn = None   # Objeto de conexión a MySQL
-        self.cursor = None # Cursor para ejecutar consultas
+        try:
+            return pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            crear = self._abiertas < self.pool_size
+            if crear:
+                self._abiertas += 1
+        if crear:
+            try:
+                return self._nueva_conexion()
+            except Error:
+                with self._lock:
+                    self._abiertas -= 1
+                raise
+
+        # Se espera por tramos para notar si mientras tanto se cerró el pool:
+        # tras close() las conexiones ya no vuelven a esta cola
+        while True:
+            try:
+                return pool.get(timeout=0.5)
+            except queue.Empty:
+                with self._lock:
+                    cerrado = self._pool is not pool
+                if cerrado:
+                    raise RuntimeError(SIN_CONEXION)
+
+    def _descartar(self, conn) -> None:
+        """Cierra una conexión que ya no debe volver al pool."""
+        try:
+            conn.close()
+        except Error:
+            pass
+        with self._lock:
+            self._abiertas -= 1
+
+    @staticmethod
+    def _conexion_rota(conn, error) -> bool:
+        """
+        Indica si un OperationalError dejó la conexión inservible. Errores de
+        la sentencia (columna desconocida, columna duplicada...) también son
+        OperationalError en mysqlclient, pero la conexión sigue sirviendo.
+        """
+        if error.args and error.args[0] in CONEXION_PERDIDA:
+            return True
+        try:
+            conn.ping()
+        except Error:
+            return True
+        return False
+
+    def _devolver(self, conn) -> None:
+        """
+        Regresa una conexión prestada al pool. Si mientras tanto se llamó a
+        close() (ya no hay pool) la conexión se cierra en lugar de devolverla.
+        """
+        with self._lock:
+            pool = self._pool
+            if pool is not None:
+                pool.put(conn)
+                return
+        self._descartar(conn)
+
+    @contextmanager
+    def _conexion(self):
+        """
+        Presta una conexión del pool durante un bloque with.
+
+        Si el bloque falla se revierte la transacción; si la conexión quedó
+        rota (servidor reiniciado, timeout) se descarta en lugar de devolverla.
+        """
+        # _tomar_conexion lanza RuntimeError si no hay pool
+        conn = self._tomar_conexion()
+        try:
+            yield conn
+        except BaseException as e:
+            if isinstance(e, MySQLdb.OperationalError) and self._conexion_rota(conn, e):
+                self._descartar(conn)
+                raise
+            try:
+                conn.rollback()
+            except Error:
+                self._descartar(conn)
+                raise
+            self._devolver(conn)
+            raise
+        else:
+            self._devolver(conn)
 
     def connect(self) -> None:
         """
-        Abre la conexión con el servidor MySQL.
+        Crea el pool de conexiones y abre la primera para validar los datos de acceso.
 
-        Si la conexión es exitosa, inicializa self.conn y self.cursor.
         En caso de error, muestra el mensaje en consola.
         """
+        self._pool = queue.LifoQueue()
         try:
-            self.conn = mysql.connector.connect(
-                host=self.host,
-                port=self.port,
-                user=self.user,
-                password=self.password,
-                database=self.database,
-            )
-            # dictionary=True hace que el resultado de fetchall() sea una lista de diccionarios
-            # en lugar de tuplas. Es más cómodo porque podemos acceder por nombre de columna.
-            self.cursor = self.conn.cursor(dictionary=True)
+            with self._lock:
+                self._abiertas += 1
+            self._pool.put(self._nueva_conexion())
             print("Conectado a MySQL correctamente.")
         except Error as e:
+            with self._lock:
+                self._abiertas -= 1
             print(f"Error al conectar a MySQL: {e}")
-            self.conn = None
-            self.cursor = None
+            self._pool = None
+
+    def is_connected(self) -> bool:
+        """Indica si connect() logró crear el pool de conexiones."""
+        return self._pool is not None
 
     def close(self) -> None:
         """
-        Cierra el cursor y la conexión con la base de datos.
+        Cierra todas las conexiones libres del pool. Las que sigan prestadas
+        a otro hilo se cierran cuando ese hilo termine su consulta.
 
         Es importante llamarlo al final del programa para liberar recursos.
         """
-        if self.cursor is not None:
-            self.cursor.close()
-        if self.conn is not None:
-            self.conn.close()
+        with self._lock:
+            pool, self._pool = self._pool, None
+
+        if pool is not None:
+            while True:
+                try:
+                    conn = pool.get_nowait()
+                except queue.Empty:
+                    break
+                self._descartar(conn)
 
-        self.cursor = None
-        self.conn = None
         print("Conexión a la base de datos cerrada.")
 
-    def execute_query(self, query: str, params: tuple | None = None):
+    def execute_query(
+        self, query: str, params: tuple | None = None, raise_errors: bool = False
+    ):
         """
         Ejecuta una consulta de lectura (SELECT) y devuelve todos los resultados.
 
@@ -93,20 +245,25 @@ class MySQLDatabase:
         - query: cadena SQL con la consulta SELECT.
                   Se recomienda usar placeholders (%s) para parámetros.
         - params: tupla con los valores a sustituir en los placeholders.
+        - raise_errors: si es True, un error de MySQL se propaga en lugar de
+                  devolver una lista vacía (para distinguir "sin resultados"
+                  de "falló la consulta").
 
         Retorno:
         - Lista de diccionarios con los resultados, o lista vacía si hubo error.
         """
-        if self.conn is None or self.cursor is None:
-            raise RuntimeError(
-                "No hay conexión a la base de datos. Llama primero a connect()."
-            )
-
         try:
-            self.cursor.execute(query, params or ())
-            results = self.cursor.fetchall()
-            return results
+            with self._conexion() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+                # Se cierra la transacción de lectura para que la siguiente
+                # consulta con esta conexión vea los datos actuales
+                conn.commit()
+                return list(results)
         except Error as e:
+            if raise_errors:
+                raise
             print(f"Error al ejecutar la consulta: {e}")
             return []
 
@@ -119,19 +276,104 @@ class MySQLDatabase:
         - params: tupla con los valores para los placeholders.
 
         Retorno:
-        - Número de filas afectadas, o 0 si hubo algún error.
+        - Número de filas afectadas, o 0 si hubo algún error (se revierte la transacción).
         """
-        if self.conn is None or self.cursor is None:
-            raise RuntimeError(
-                "No hay conexión a la base de datos. Llama primero a connect()."
-            )
-
         try:
-            self.cursor.execute(query, params or ())
-            self.conn.commit()
-            return self.cursor.rowcount
+            with self._conexion() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+                    conn.commit()
+                    return cursor.rowcount
         except Error as e:
             print(f"Error al ejecutar la operación: {e}")
-            # Si hay error, revertimos la transacción
-            self.conn.rollback()
             return 0
+
+    def execute_many(self, query: str, rows) -> int:
+        """
+        Ejecuta la misma sentencia de escritura para muchas filas y hace un solo commit.
+
+        Para cargas masivas es mucho más rápido que llamar a execute_non_query
+        por cada fila: en un INSERT el conector agrupa todas las filas en una
+        sola sentencia y se hace un solo viaje al servidor y un solo commit.
+
+        Parámetros:
+        - query: cadena SQL con placeholders (%s), por ejemplo un INSERT.
+        - rows: secuencia de tuplas, una por fila, con los valores de los placeholders.
+
+        Retorno:
+        - Número de filas afectadas, o 0 si hubo algún error (se revierte todo el lote).
+        """
+        try:
+            with self._conexion() as conn:
+                with conn.cursor() as cursor:
+                    cursor.executemany(query, rows)
+                    conn.commit()
+                    return cursor.rowcount
+        except Error as e:
+            print(f"Error al ejecutar el lote: {e}")
+            return 0
+
+    async def connect_async(self, minsize: int = 2, maxsize: int = 4) -> bool:
+        """
+        Crea un pool asíncrono (aiomysql) para consultar sin bloquear al que llama.
+
+        Se debe llamar desde el event loop donde después se harán las consultas.
+        Devuelve True si el pool quedó listo, False si aiomysql no está instalado
+        o no se pudo conectar (en ese caso se siguen usando los métodos síncronos).
+        """
+        if aiomysql is None:
+            print("aiomysql no está instalado; las consultas serán síncronas.")
+            return False
+
+        try:
+            self._async_pool = await aiomysql.create_pool(
+                host=self.host,
+                port=self.port,
+                user=self.user,
+                password=self.password,
+                db=self.database,
+                charset="utf8mb4",
+                # Solo lecturas: autocommit para que cada consulta vea datos actuales
+                autocommit=True,
+                minsize=minsize,
+                maxsize=maxsize,
+            )
+            print("Pool asíncrono de MySQL listo.")
+            return True
+        except aiomysql.Error as e:
+            print(f"Error al crear el pool asíncrono de MySQL: {e}")
+            self._async_pool = None
+            return False
+
+    async def close_async(self) -> None:
+        """Cierra el pool asíncrono y espera a que terminen sus conexiones."""
+        if self._async_pool is not None:
+            self._async_pool.close()
+            await self._async_pool.wait_closed()
+            self._async_pool = None
+
+    async def execute_query_async(
+        self, query: str, params: tuple | None = None, raise_errors: bool = False
+    ):
+        """
+        Versión asíncrona de execute_query usando el pool de aiomysql.
+        raise_errors funciona igual que en execute_query.
+
+        Retorno:
+        - Lista de diccionarios con los resultados, o lista vacía si hubo error.
+        """
+        if self._async_pool is None:
+            raise RuntimeError(
+                "No hay pool asíncrono. Llama primero a connect_async()."
+            )
+
+        try:
+            async with self._async_pool.acquire() as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(query, params)
+                    return list(await cursor.fetchall())
+        except aiomysql.Error as e:
+            if raise_errors:
+                raise
+            print(f"Error al ejecutar la consulta: {e}")
+            return []
@@ -5,7 +5,7 @@ main.py
 Punto de entrada del sistema de detección de matrículas en tiempo real usando webcam.
 
 Arquitectura general:
-- Captura de video: OpenCV (cv2.VideoCapture).
+- Captura de video: OpenCV (cv2.VideoCapture) en su propio hilo.
 - Detección de placa: PlateDetector (YOLO/Ultralytics) en plateRecognition.py.
 - OCR del texto de la placa: PlateOCR (EasyOCR) en plate_ocr.py.
 - Búsqueda en base de datos: SearchVehicle (consultas MySQL) en search_vehicle.py.
@@ -21,23 +21,619 @@ Arquitectura general:
 
 Flujo de alto nivel:
 1. Se abre la webcam.
-2. Cada N frames se redimensiona el frame para reducir carga y se pasa a YOLO.
+2. Cuando hay movimiento en la escena (o cada MAX_SKIP frames) se redimensiona
+   el frame para reducir carga y se pasa a YOLO.
 3. Se obtiene el bounding box de la placa, se reescala al tamaño original y
    se recorta la placa.
-4. El recorte se pasa a EasyOCR para obtener el texto de la matrícula.
+4. El recorte se acumula en un buffer y se pasa por lotes a EasyOCR para
+   obtener el texto de la matrícula.
 5. Con la matrícula se consulta la base de datos para obtener los datos
    del propietario.
 6. Se dibuja el bounding box, la placa y el nombre del propietario en el frame
    y se muestra en una ventana.
+
+Los pasos corren en tres hilos conectados por colas pequeñas (WebcamPipeline):
+captura -> inferencia (YOLO + OCR + BD + dibujo) -> visualización (hilo principal).
+Así un OCR o una consulta lenta no frena la lectura de la cámara.
 """
 
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from contextlib import nullcontext
+
 import cv2
+import numpy as np
+import torch
 from Db_conector import MySQLDatabase
 from search_vehicle import SearchVehicle
 from PlateRecognition import PlateDetector
 from plate_ocr import PlateOCR
 
 
+# Para no saturar CPU, YOLO solo corre cuando la escena cambia: se compara el
+# frame contra el anterior en miniatura (MOTION_SIZE, grises) y se detecta si la
+# diferencia media por píxel supera MOTION_THRESHOLD. Aunque no haya movimiento
+# se detecta al menos cada MAX_SKIP frames (por ejemplo, un auto ya detenido).
+MOTION_SIZE = (80, 45)
+MOTION_THRESHOLD = 4.0
+MAX_SKIP = 30
+
+# Ancho (px) del frame reducido que entra a YOLO
+DETECT_WIDTH = 320
+
+# OCR por lotes: se lee el buffer de recortes cuando junta OCR_BATCH_SIZE
+# o cuando el recorte más viejo lleva OCR_FLUSH_SECONDS esperando.
+OCR_BATCH_SIZE = 8
+OCR_FLUSH_SECONDS = 0.25
+
+# Caché del OCR por hash perceptual (8x8) del recorte de la placa:
+# - Si el recorte difiere del último leído en menos de PHASH_MAX_DISTANCE bits,
+#   es el mismo auto y no se vuelve a correr el OCR.
+# - OCR_CACHE_SIZE lecturas recientes se recuerdan por su hash exacto (LRU).
+PHASH_MAX_DISTANCE = 5
+OCR_CACHE_SIZE = 64
+
+WINDOW_NAME = "Sistema de detección de matrículas (Webcam)"
+
+
+class WebcamPipeline:
+    """
+    Clase WebcamPipeline
+
+    Pipeline productor/consumidor de tres etapas:
+    - Hilo de captura: hace cap.grab() sin parar para vaciar el buffer del driver,
+      y solo decodifica (cap.retrieve()) cuando el hilo de inferencia pide un
+      frame; lo deja en raw_frames.
+    - Hilo de inferencia: pide el frame más reciente, corre YOLO + OCR + BD cada
+      N frames, dibuja la última información conocida y lo deja en annotated_frames.
+    - Hilo principal: muestra los frames anotados (OpenCV exige que imshow/waitKey
+      se llamen desde el hilo principal).
+
+    Las colas tienen tamaño 2 y descartan el frame más viejo cuando están llenas,
+    así siempre se trabaja con lo último que vio la cámara.
+
+    Parámetros del constructor:
+    - cap: cv2.VideoCapture ya abierto.
+    - detector: instancia de PlateDetector.
+    - ocr: instancia de PlateOCR.
+    - search_vehicle: instancia de SearchVehicle.
+    - db_loop: event loop (corriendo en otro hilo) con el pool asíncrono de la BD.
+               Si es None las consultas se hacen de forma síncrona.
+    """
+
+    def __init__(self, cap, detector, ocr, search_vehicle, db_loop=None):
+        self.cap = cap
+        self.detector = detector
+        self.ocr = ocr
+        self.search_vehicle = search_vehicle
+        self.db_loop = db_loop
+
+        # Stream de CUDA compartido por YOLO y EasyOCR (None sin GPU)
+        self.cuda_stream = torch.cuda.Stream() if torch.cuda.is_available() else None
+
+        # Buffer reutilizable para el frame reducido que entra a YOLO.
+        # Se reserva con el primer frame (o si cambia la resolución de la cámara).
+        self._scaled = None
+        self._frame_shape = None
+        self._scale_x = 1.0
+        self._scale_y = 1.0
+        self._bbox_scale = None
+        self._bbox_max = None
+
+        self.raw_frames = queue.Queue(maxsize=2)
+        self.annotated_frames = queue.Queue(maxsize=2)
+
+        # Se activa al presionar 'q' o si la cámara deja de entregar frames
+        self.stop_event = threading.Event()
+
+        # El hilo de inferencia lo activa cuando está listo para otro frame
+        self.frame_request = threading.Event()
+
+        # Hash del último recorte que sí dio texto y caché LRU hash -> placa
+        self._last_phash = None
+        self._ocr_cache = OrderedDict()
+
+        # Última información conocida de la placa (x1, y1, x2, y2), texto y propietario.
+        # La escribe el hilo de inferencia y se lee al dibujar.
+        self._lock = threading.Lock()
+        # pending indica que la consulta del propietario sigue en curso.
+        self._state = {"bbox": None, "plate": None, "owner": None, "pending": False}
+
+        # Overlay pre-renderizado con la información de la placa. Solo se vuelve
+        # a dibujar cuando cambia el estado (_overlay_dirty); en cada frame se
+        # copia la región _overlay_roi donde la máscara está encendida.
+        self._overlay = None
+        self._overlay_mask = None
+        self._overlay_roi = None
+        self._overlay_where = None  # Máscara booleana (h, w, 1) de la región
+        self._overlay_dirty = True
+
+        # Miniatura en grises del frame anterior para medir movimiento
+        self._prev_small = None
+
+    @staticmethod
+    def _put_latest(q: queue.Queue, item) -> None:
+        """Mete item en la cola; si está llena descarta el elemento más viejo."""
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            q.put_nowait(item)
+
+    def _capture_loop(self) -> None:
+        """
+        Hilo de captura: toma frames continuamente (grab) para no quedarse con
+        frames viejos, pero solo paga la decodificación (retrieve) cuando el
+        hilo de inferencia pidió uno. grab y retrieve se llaman desde este mismo
+        hilo porque VideoCapture no es seguro entre hilos.
+        """
+        try:
+            while not self.stop_event.is_set():
+                ret = self.cap.grab()
+                if ret and self.frame_request.is_set():
+                    self.frame_request.clear()
+                    ret, frame = self.cap.retrieve()
+                    if ret:
+                        self._put_latest(self.raw_frames, frame)
+                if not ret:
+                    print("No se pudo leer el frame de la cámara.")
+                    break
+        except Exception as e:
+            print(f"Error en el hilo de captura: {e}")
+            traceback.print_exc()
+        finally:
+            # Si este hilo termina (por error o fin de video) se detiene todo,
+            # así la ventana no se queda congelada esperando frames
+            self.stop_event.set()
+
+    def _inference_loop(self) -> None:
+        """
+        Hilo de inferencia. Con GPU, YOLO y EasyOCR lanzan su trabajo en un
+        mismo stream de CUDA, así las copias y los kernels de ambos modelos
+        quedan en una sola cola ordenada.
+        """
+        stream_ctx = (
+            torch.cuda.stream(self.cuda_stream)
+            if self.cuda_stream is not None
+            else nullcontext()
+        )
+        try:
+            with stream_ctx:
+                self._process_frames()
+        except Exception as e:
+            print(f"Error en el hilo de inferencia: {e}")
+            traceback.print_exc()
+        finally:
+            # Igual que en la captura: sin inferencia no hay nada que mostrar
+            self.stop_event.set()
+
+    def _process_frames(self) -> None:
+        """Detección, OCR por lotes, consulta a BD y dibujo de cada frame."""
+        frame_count = 0     # Contador de frames
+        last_detection = 0  # Frame en que corrió YOLO por última vez
+
+        # Recortes de placa preparados para el OCR por lotes
+        crop_buffer = []
+        buffer_start = 0.0  # Momento en que entró el recorte más viejo del buffer
+
+        while not self.stop_event.is_set():
+            # Pedimos el siguiente frame; se decodifica en el próximo grab
+            self.frame_request.set()
+            try:
+                frame = self.raw_frames.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            frame_count += 1
+            run_this_frame = (
+                self._has_motion(frame) or frame_count - last_detection >= MAX_SKIP
+            )
+
+            if run_this_frame:
+                last_detection = frame_count
+                plate_crop, plate_crop_gpu = self._detect(frame)
+                if plate_crop is not None:
+                    phash = self._phash(plate_crop)
+                    cached_plate = self._cached_plate(phash)
+                    if cached_plate is not None:
+                        # Mismo auto que una lectura reciente: no hace falta OCR.
+                        # El hash nuevo también se guarda para que _last_phash
+                        # siempre apunte a una entrada de la caché
+                        self._remember_plate(phash, cached_plate)
+                        self._update_plate(cached_plate)
+                    else:
+                        # El recorte se prepara (64 x 256) y espera en el buffer del lote
+                        if not crop_buffer:
+                            buffer_start = time.monotonic()
+                        if plate_crop_gpu is not None:
+                            # El recorte ya está en GPU: se prepara ahí mismo
+                            item = self.ocr.prepare_batch_item_gpu(plate_crop_gpu)
+                        else:
+                            item = self.ocr.prepare_batch_item(plate_crop)
+                        crop_buffer.append((item, phash))
+
+            # ----- 5) Ejecutar OCR por lotes sobre los recortes acumulados -----
+            if crop_buffer and (
+                len(crop_buffer) >= OCR_BATCH_SIZE
+                or time.monotonic() - buffer_start >= OCR_FLUSH_SECONDS
+            ):
+                plate_texts = self.ocr.read_plates_batch([item for item, _ in crop_buffer])
+
+                # Nos quedamos con la lectura más reciente que sí dio texto.
+                # Si el OCR falla, no se actualiza la placa ni el propietario.
+                plate_text = None
+                for text, (_, phash) in zip(plate_texts, crop_buffer):
+                    if text:
+                        plate_text = text
+                        self._remember_plate(phash, text)
+                crop_buffer.clear()
+                if plate_text:
+                    self._update_plate(plate_text)
+
+            # ----- 7) Dibujar la información en el frame original -----
+            self._draw(frame)
+            self._put_latest(self.annotated_frames, frame)
+
+    def _has_motion(self, frame) -> bool:
+        """
+        Compara el frame con el anterior en una miniatura de 80x45 en grises.
+        Cuesta microsegundos frente a las decenas de milisegundos de YOLO.
+        """
+        small = cv2.resize(frame, MOTION_SIZE, interpolation=cv2.INTER_AREA)
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        prev, self._prev_small = self._prev_small, small
+        if prev is None:
+            return True
+        return cv2.mean(cv2.absdiff(small, prev))[0] > MOTION_THRESHOLD
+
+    def _detect(self, frame):
+        """
+        Corre YOLO sobre el frame reducido y devuelve (recorte, recorte_gpu):
+        el recorte de la placa en el frame original y, si el frame se subió a
+        la GPU y el OCR también corre ahí, el mismo recorte como tensor CUDA
+        (si no, None). Devuelve (None, None) si no hubo detección válida.
+        """
+        # ----- 1) Reducir resolución del frame para la detección -----
+        # Esto reduce la carga computacional de YOLO sin afectar demasiado
+        # la calidad del bounding box.
+        orig_h, orig_w, _ = frame.shape
+
+        if frame.shape != self._frame_shape:
+            # Ancho de detección (igual al imgsz de PlateDetector) y alto
+            # redondeado a múltiplo de 32 (el stride de YOLO), así el modelo
+            # no tiene que rellenar ni reescalar el frame
+            target_w = DETECT_WIDTH
+            target_h = max(32, round(orig_h * target_w / orig_w / 32) * 32)
+            self._scale_x = target_w / float(orig_w)
+            self._scale_y = target_h / float(orig_h)
+            # Factores y límites por coordenada (x1, y1, x2, y2) para reescalar cajas
+            self._bbox_scale = np.array(
+                [self._scale_x, self._scale_y, self._scale_x, self._scale_y]
+            )
+            self._bbox_max = np.array([orig_w - 1, orig_h - 1, orig_w - 1, orig_h - 1])
+            self._scaled = np.empty((target_h, target_w, 3), dtype=np.uint8)
+            self._frame_shape = frame.shape
+        target_h, target_w = self._scaled.shape[:2]
+
+        if self.detector.use_cuda:
+            # ----- 1-2) Con GPU: se sube el frame una vez (memoria fija) y la
+            # reducción + detección ocurren en la GPU, sin ida y vuelta a la CPU
+            bbox_small = self.detector.detect_plate_from_gpu(frame, (target_w, target_h))
+        else:
+            # INTER_AREA es más rápido y da mejor resultado al reducir
+            scaled_frame = cv2.resize(
+                frame,
+                (target_w, target_h),
+                dst=self._scaled,
+                interpolation=cv2.INTER_AREA,
+            )
+
+            # ----- 2) Detectar la placa en el frame reducido -----
+            # Solo hace falta el bbox: la placa se recorta del frame original
+            bbox_small = self.detector.detect_bbox_from_image(scaled_frame)
+        if bbox_small is None:
+            # No hubo detección en este frame reducido
+            return None, None
+
+        # ----- 3) Reescalar bounding box al frame original -----
+        # Escalado y recorte a los límites de la imagen en una sola expresión
+        coords = np.array(bbox_small, dtype=np.float64) / self._bbox_scale
+        x1, y1, x2, y2 = np.clip(coords.astype(np.int32), 0, self._bbox_max).tolist()
+
+        if not (x2 > x1 and y2 > y1):
+            # Bounding box inválido tras reescalar (descartamos)
+            return None, None
+
+        # Guardamos el último bounding box válido
+        with self._lock:
+            if self._state["bbox"] != (x1, y1, x2, y2):
+                self._state["bbox"] = (x1, y1, x2, y2)
+                self._overlay_dirty = True
+
+        # ----- 4) Recortar la placa del frame original -----
+        # Usamos el frame original para que el OCR tenga mejor calidad.
+        # Es una vista sin copia: prepare_batch_item la lee antes de que
+        # _draw pinte sobre el frame, y el preprocesamiento no la modifica.
+        # Con GPU el recorte también se toma del frame que ya subió el
+        # detector, así el OCR no vuelve a copiar la placa desde la CPU.
+        plate_crop_gpu = None
+        if self.detector.use_cuda and self.ocr.use_cuda:
+            plate_crop_gpu = self.detector.last_gpu_frame[y1:y2, x1:x2]
+        return frame[y1:y2, x1:x2], plate_crop_gpu
+
+    @staticmethod
+    def _phash(plate_crop) -> int:
+        """
+        Hash perceptual de 64 bits del recorte: se reduce a 8x8 en grises y cada
+        bit indica si el píxel es más claro que el promedio.
+        """
+        small = cv2.resize(plate_crop, (8, 8), interpolation=cv2.INTER_AREA)
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        bits = small > small.mean()
+        return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+    def _cached_plate(self, phash: int) -> str | None:
+        """Devuelve la placa ya leída para un recorte equivalente, o None si hay que hacer OCR."""
+        plate = self._ocr_cache.get(phash)
+        if plate is not None:
+            self._ocr_cache.move_to_end(phash)
+            return plate
+
+        # Casi igual al último recorte leído: el auto no se movió
+        if (
+            self._last_phash is not None
+            and (phash ^ self._last_phash).bit_count() < PHASH_MAX_DISTANCE
+        ):
+            return self._ocr_cache.get(self._last_phash)
+        return None
+
+    def _remember_plate(self, phash: int, plate_text: str) -> None:
+        """Guarda la lectura en la caché LRU, descartando la más vieja si está llena."""
+        self._ocr_cache[phash] = plate_text
+        self._ocr_cache.move_to_end(phash)
+        if len(self._ocr_cache) > OCR_CACHE_SIZE:
+            self._ocr_cache.popitem(last=False)
+        self._last_phash = phash
+
+    def _update_plate(self, plate_text: str) -> None:
+        """
+        Si la placa cambió, consulta al propietario en la BD y lo imprime.
+
+        Con db_loop la consulta se lanza en el event loop de la BD y el hilo de
+        inferencia sigue con el siguiente frame; el propietario se actualiza
+        cuando llega la respuesta (_on_owner).
+        """
+        # Solo si la placa cambió, volvemos a consultar la BD.
+        # Esto evita repetir consultas y OCR innecesariamente.
+        with self._lock:
+            if plate_text == self._state["plate"]:
+                return
+            if self.db_loop is not None:
+                # La placa se muestra ya; el propietario llega después
+                self._state["plate"] = plate_text
+                self._state["owner"] = None
+                self._state["pending"] = True
+                self._overlay_dirty = True
+
+        print(f"\nPlaca detectada: {plate_text}")
+
+        # ----- 6) Búsqueda del propietario en la base de datos -----
+        if self.db_loop is not None:
+            future = asyncio.run_coroutine_threadsafe(
+                self.search_vehicle.find_owner_by_plate_async(plate_text), self.db_loop
+            )
+            future.add_done_callback(lambda f: self._on_owner(plate_text, f))
+            return
+
+        owner_data = self.search_vehicle.find_owner_by_plate(plate_text)
+        self._set_owner(plate_text, owner_data)
+
+    def _on_owner(self, plate_text: str, future) -> None:
+        """Callback de la consulta asíncrona (corre en el hilo del event loop)."""
+        try:
+            owner_data = future.result()
+        except Exception as e:
+            print(f"Error en la consulta asíncrona: {e}")
+            # No es un "no encontrada": se olvida la placa para que la
+            # siguiente lectura vuelva a consultar la BD
+            with self._lock:
+                if self._state["plate"] == plate_text:
+                    self._state["plate"] = None
+                    self._state["owner"] = None
+                    self._state["pending"] = False
+                    self._overlay_dirty = True
+            return
+
+        # Si mientras tanto se leyó otra placa, esta respuesta ya no aplica
+        self._set_owner(plate_text, owner_data, only_if_current=True)
+
+    def _set_owner(self, plate_text: str, owner_data, only_if_current: bool = False) -> None:
+        """
+        Guarda el propietario de la placa y lo imprime.
+
+        Con only_if_current solo se guarda si plate_text sigue siendo la placa
+        mostrada; la revisión y la escritura van bajo el mismo lock para que
+        otra placa no se cuele entre ambas.
+        """
+        with self._lock:
+            if only_if_current and self._state["plate"] != plate_text:
+                return
+            self._state["plate"] = plate_text
+            self._state["owner"] = owner_data
+            self._state["pending"] = False
+            self._overlay_dirty = True
+
+        if owner_data:
+            print("Información del propietario:")
+            print(f"  Placa:      {owner_data['placa']}")
+            print(f"  Marca:      {owner_data['marca']}")
+            print(f"  Modelo:     {owner_data['modelo']}")
+            print(f"  Año:        {owner_data['anio']}")
+            print(f"  Propietario:{owner_data['nombre']}")
+            print(f"  Teléfono:   {owner_data['telefono']}")
+            print(f"  Email:      {owner_data['email']}")
+        else:
+            print("La placa no se encontró en la base de datos.")
+
+    @staticmethod
+    def _paint(img, bbox, plate, owner_text, green, white) -> None:
+        """Dibuja la caja, la placa y el propietario sobre img con los colores dados."""
+        x1, y1, x2, y2 = bbox
+
+        # Dibujamos la caja de la última placa detectada
+        cv2.rectangle(img, (x1, y1), (x2, y2), green, 2)
+
+        # Mostramos el texto de la placa arriba del bounding box
+        if plate:
+            cv2.putText(
+                img,
+                plate,
+                (x1, max(y1 - 10, 0)),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.8,
+                green,
+                2,
+            )
+
+        y_text = y2 + 25
+        if y_text >= img.shape[0]:
+            y_text = y2 - 10
+
+        cv2.putText(
+            img,
+            owner_text,
+            (x1, y_text),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            white,
+            2,
+        )
+
+    def _render_overlay(self, frame_shape) -> None:
+        """
+        Vuelve a dibujar el overlay (colores + máscara) con el estado actual.
+        Solo se llama cuando cambió la caja, la placa o el propietario.
+        """
+        h, w = frame_shape[:2]
+        if self._overlay is None or self._overlay.shape != frame_shape:
+            self._overlay = np.zeros(frame_shape, dtype=np.uint8)
+            self._overlay_mask = np.zeros((h, w), dtype=np.uint8)
+        elif self._overlay_roi is not None:
+            # Basta limpiar la región que se pintó la vez anterior
+            self._overlay[self._overlay_roi] = 0
+            self._overlay_mask[self._overlay_roi] = 0
+        self._overlay_roi = None
+
+        with self._lock:
+            last_bbox = self._state["bbox"]
+            last_plate = self._state["plate"]
+            last_owner = self._state["owner"]
+            pending = self._state["pending"]
+            self._overlay_dirty = False
+
+        if last_bbox is None:
+            return
+
+        # Mostramos el nombre del propietario o un mensaje si no está en BD
+        owner_text = "No encontrada en BD"
+        if last_owner:
+            owner_text = last_owner["nombre"]
+        elif pending:
+            owner_text = "Buscando en BD..."
+
+        self._paint(self._overlay, last_bbox, last_plate, owner_text, (0, 255, 0), (255, 255, 255))
+        self._paint(self._overlay_mask, last_bbox, last_plate, owner_text, 255, 255)
+
+        # Región mínima que contiene todo lo dibujado
+        x, y, rw, rh = cv2.boundingRect(self._overlay_mask)
+        if rw > 0 and rh > 0:
+            self._overlay_roi = (slice(y, y + rh), slice(x, x + rw))
+            self._overlay_where = self._overlay_mask[self._overlay_roi][:, :, None] > 0
+
+    def _draw(self, frame) -> None:
+        """
+        Pinta el bounding box, la placa y el propietario sobre el frame.
+
+        El texto se rasteriza una sola vez en un overlay cuando cambia la
+        información; en cada frame solo se copian los píxeles pintados de la
+        región del overlay (una operación vectorizada en lugar de tres llamadas
+        de dibujo).
+        """
+        if self._overlay_dirty or self._overlay is None or self._overlay.shape != frame.shape:
+            self._render_overlay(frame.shape)
+
+        if self._overlay_roi is None:
+            return
+
+        roi = self._overlay_roi
+        np.copyto(frame[roi], self._overlay[roi], where=self._overlay_where)
+
+    def run(self) -> None:
+        """Arranca los hilos de captura e inferencia y muestra frames hasta presionar 'q'."""
+        threads = [
+            threading.Thread(target=self._capture_loop, name="captura", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inferencia", daemon=True),
+        ]
+        for t in threads:
+            t.start()
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    frame = self.annotated_frames.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                # ----- 8) Mostrar el frame en una ventana -----
+                cv2.imshow(WINDOW_NAME, frame)
+
+                # Salir del bucle cuando se presione la tecla 'q'
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+        finally:
+            self.stop_event.set()
+            for t in threads:
+                t.join(timeout=2.0)
+
+
+def _start_db_loop(db: MySQLDatabase):
+    """
+    Arranca un event loop en un hilo aparte y crea ahí el pool asíncrono de la BD.
+    Devuelve el loop, o None si no se pudo (se usan las consultas síncronas).
+    Si el servidor no responde en 5 s tampoco se espera más: se usan las
+    consultas síncronas y la cámara arranca igual.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="bd", daemon=True).start()
+
+    future = asyncio.run_coroutine_threadsafe(db.connect_async(), loop)
+    try:
+        if future.result(timeout=5):
+            return loop
+    except concurrent.futures.TimeoutError:
+        print("MySQL tardó demasiado en responder; las consultas serán síncronas.")
+        future.cancel()
+
+    loop.call_soon_threadsafe(loop.stop)
+    return None
+
+
+def _stop_db_loop(db: MySQLDatabase, loop) -> None:
+    """Cierra el pool asíncrono y detiene el event loop de la BD."""
+    try:
+        asyncio.run_coroutine_threadsafe(db.close_async(), loop).result(timeout=5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+
+
 def run_on_webcam(camera_index: int = 0) -> None:
     """
     Función principal de ejecución en modo webcam.
@@ -49,7 +645,7 @@ def run_on_webcam(camera_index: int = 0) -> None:
     Responsabilidades:
     - Crear la conexión a la base de datos.
     - Instanciar las clases de detección de placas, OCR y búsqueda de vehículo.
-    - Abrir la cámara y procesar los frames en un bucle.
+    - Abrir la cámara y procesar los frames con WebcamPipeline.
     - Mostrar en pantalla la imagen anotada con la info de la placa y el propietario.
     """
 
@@ -65,10 +661,13 @@ def run_on_webcam(camera_index: int = 0) -> None:
 
     # SearchVehicle se encarga de las consultas a la BD a partir de la placa
     search_vehicle = SearchVehicle(db)
+    if db.is_connected():
+        # Bases creadas con el script SQL anterior no tienen placa_norm
+        search_vehicle.ensure_schema()
 
     # PlateDetector usa YOLO para encontrar la placa en el frame
     # conf_threshold controla el umbral mínimo de confianza (0.5 = 50%)
-    detector = PlateDetector(conf_threshold=0.5)
+    detector = PlateDetector(conf_threshold=0.5, imgsz=DETECT_WIDTH)
 
     # PlateOCR hace el reconocimiento de caracteres sobre el recorte de la placa
     # languages=['en'] porque trabajamos con caracteres alfanuméricos, basta inglés.
@@ -81,160 +680,22 @@ def run_on_webcam(camera_index: int = 0) -> None:
         db.close()
         return
 
-    print("Cámara iniciada. Presiona 'q' para salir.")
+    # Buffer interno de un solo frame: lo que se toma siempre es lo más reciente
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
-    # Variables de estado para no repetir OCR/consultas innecesarias
-    last_plate = None   # Última placa leída (texto)
-    last_owner = None   # Último propietario encontrado (diccionario de BD)
-    last_bbox = None    # Último bounding box (x1, y1, x2, y2)
-    frame_count = 0     # Contador de frames para espaciar las detecciones
-
-    try:
-        while True:
-            # Leemos un frame de la cámara
-            ret, frame = cap.read()
-            if not ret:
-                print("No se pudo leer el frame de la cámara.")
-                break
+    # Consultas a la BD sin bloquear la inferencia (aiomysql en su propio event loop)
+    db_loop = _start_db_loop(db)
 
-            frame_count += 1
-
-            # Para no saturar CPU, solo corremos YOLO + OCR cada N frames
-            RUN_EVERY_N_FRAMES = 10
-            run_this_frame = (frame_count % RUN_EVERY_N_FRAMES == 0)
-
-            if run_this_frame:
-                # ----- 1) Reducir resolución del frame para la detección -----
-                # Esto reduce la carga computacional de YOLO sin afectar demasiado
-                # la calidad del bounding box.
-                orig_h, orig_w, _ = frame.shape
-
-                target_w = 640  # Ancho deseado para detección (ajustable)
-                scale_factor = target_w / float(orig_w)
-                target_h = int(orig_h * scale_factor)
-
-                scaled_frame = cv2.resize(
-                    frame,
-                    (target_w, target_h),
-                    interpolation=cv2.INTER_LINEAR,
-                )
-
-                # ----- 2) Detectar la placa en el frame reducido -----
-                plate_crop_small, bbox_small = detector.detect_plate_from_image(
-                    scaled_frame
-                )
-
-                if bbox_small is not None:
-                    x1_s, y1_s, x2_s, y2_s = bbox_small
-
-                    # ----- 3) Reescalar bounding box al frame original -----
-                    x1 = int(x1_s / scale_factor)
-                    x2 = int(x2_s / scale_factor)
-                    y1 = int(y1_s / scale_factor)
-                    y2 = int(y2_s / scale_factor)
-
-                    # Aseguramos que las coordenadas estén dentro de la imagen
-                    x1 = max(0, min(x1, orig_w - 1))
-                    x2 = max(0, min(x2, orig_w - 1))
-                    y1 = max(0, min(y1, orig_h - 1))
-                    y2 = max(0, min(y2, orig_h - 1))
-
-                    if x2 > x1 and y2 > y1:
-                        # Guardamos el último bounding box válido
-                        last_bbox = (x1, y1, x2, y2)
-
-                        # ----- 4) Recortar la placa del frame original -----
-                        # Usamos el frame original para que el OCR tenga mejor calidad.
-                        plate_crop = frame[y1:y2, x1:x2].copy()
-
-                        # ----- 5) Ejecutar OCR sobre el recorte de la placa -----
-                        plate_text = ocr.read_plate(plate_crop)
-
-                        if plate_text:
-                            # Solo si la placa cambió, volvemos a consultar la BD.
-                            # Esto evita repetir consultas y OCR innecesariamente.
-                            if plate_text != last_plate:
-                                last_plate = plate_text
-                                print(f"\nPlaca detectada: {plate_text}")
-
-                                # ----- 6) Búsqueda del propietario en la base de datos -----
-                                owner_data = search_vehicle.find_owner_by_plate(
-                                    plate_text
-                                )
-                                last_owner = owner_data
-
-                                if owner_data:
-                                    print("Información del propietario:")
-                                    print(f"  Placa:      {owner_data['placa']}")
-                                    print(f"  Marca:      {owner_data['marca']}")
-                                    print(f"  Modelo:     {owner_data['modelo']}")
-                                    print(f"  Año:        {owner_data['anio']}")
-                                    print(f"  Propietario:{owner_data['nombre']}")
-                                    print(f"  Teléfono:   {owner_data['telefono']}")
-                                    print(f"  Email:      {owner_data['email']}")
-                                else:
-                                    print(
-                                        "La placa no se encontró en la base de datos."
-                                    )
-                        else:
-                            # Si el OCR falla, no se actualiza last_plate/last_owner.
-                            pass
-                    else:
-                        # Bounding box inválido tras reescalar (descartamos)
-                        pass
-                else:
-                    # No hubo detección en este frame reducido
-                    pass
-
-            # ----- 7) Dibujar la información en el frame original -----
-            if last_bbox is not None:
-                x1, y1, x2, y2 = last_bbox
-
-                # Dibujamos la caja de la última placa detectada
-                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-                # Mostramos el texto de la placa arriba del bounding box
-                if last_plate:
-                    cv2.putText(
-                        frame,
-                        last_plate,
-                        (x1, max(y1 - 10, 0)),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.8,
-                        (0, 255, 0),
-                        2,
-                    )
-
-                # Mostramos el nombre del propietario o un mensaje si no está en BD
-                owner_text = "No encontrada en BD"
-                if last_owner:
-                    owner_text = last_owner["nombre"]
-
-                y_text = y2 + 25
-                if y_text >= frame.shape[0]:
-                    y_text = y2 - 10
-
-                cv2.putText(
-                    frame,
-                    owner_text,
-                    (x1, y_text),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    (255, 255, 255),
-                    2,
-                )
-
-            # ----- 8) Mostrar el frame en una ventana -----
-            cv2.imshow("Sistema de detección de matrículas (Webcam)", frame)
-
-            # Salir del bucle cuando se presione la tecla 'q'
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
+    print("Cámara iniciada. Presiona 'q' para salir.")
 
+    try:
+        WebcamPipeline(cap, detector, ocr, search_vehicle, db_loop=db_loop).run()
     finally:
         # Liberamos recursos siempre, incluso si hay errores
         cap.release()
         cv2.destroyAllWindows()
+        if db_loop is not None:
+            _stop_db_loop(db, db_loop)
         db.close()
         print("Cámara y conexión a BD cerradas.")
 
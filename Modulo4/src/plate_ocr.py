@@ -8,10 +8,106 @@ a partir de una imagen recortada (BGR) usando EasyOCR.
 Tecnologías usadas:
 - EasyOCR: librería de OCR basada en deep learning.
 - OpenCV: se usa para preprocesar la imagen (escala de grises, resize, binarización).
+- PyTorch: para detectar si hay GPU (CUDA) donde correr las redes de EasyOCR.
+- TensorRT (opcional): compila el detector y el reconocedor de EasyOCR a
+  engines FP16 para la GPU. Si no está instalado se usa PyTorch normal.
 """
 
+from pathlib import Path
+
 import easyocr
 import cv2
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+try:
+    import tensorrt as trt
+except ImportError:
+    trt = None
+
+
+class _SoloImagen(torch.nn.Module):
+    """
+    Envoltura para exportar el reconocedor a ONNX: su forward recibe (imagen, texto)
+    pero el texto no se usa, así que el grafo exportado solo tiene la imagen.
+    """
+
+    def __init__(self, modulo):
+        super().__init__()
+        self.modulo = modulo
+
+    def forward(self, x):
+        return self.modulo(x, None)
+
+
+class _MotorTRT:
+    """
+    Sustituto del detector o reconocedor de EasyOCR que ejecuta un engine de TensorRT.
+
+    Se llama igual que el módulo de PyTorch original (EasyOCR no nota la
+    diferencia). Los buffers de salida en la GPU se reservan una vez y se
+    reutilizan mientras la forma no cambie. Si la entrada queda fuera del
+    perfil con el que se compiló el engine, se usa el módulo original.
+    """
+
+    def __init__(self, engine_path, modulo_original, perfil):
+        logger = trt.Logger(trt.Logger.WARNING)
+        with open(engine_path, "rb") as f, trt.Runtime(logger) as runtime:
+            self.engine = runtime.deserialize_cuda_engine(f.read())
+        self.context = self.engine.create_execution_context()
+        self.modulo = modulo_original
+
+        # Formas mínima y máxima aceptadas por el engine (perfil = (min, opt, max))
+        self.forma_min, _, self.forma_max = perfil
+
+        nombres = [self.engine.get_tensor_name(i) for i in range(self.engine.num_io_tensors)]
+        self.entrada = nombres[0]
+        self.salidas = nombres[1:]
+
+        self._buffers = {}  # nombre de salida -> tensor en GPU reutilizable
+
+    def _cabe(self, forma) -> bool:
+        return len(forma) == len(self.forma_min) and all(
+            lo <= d <= hi for d, lo, hi in zip(forma, self.forma_min, self.forma_max)
+        )
+
+    def _buffer(self, nombre, forma):
+        buf = self._buffers.get(nombre)
+        if buf is None or tuple(buf.shape) != forma:
+            buf = torch.empty(forma, dtype=torch.float32, device="cuda")
+            self._buffers[nombre] = buf
+        return buf
+
+    def __call__(self, x, *args):
+        if not self._cabe(tuple(x.shape)):
+            return self.modulo(x, *args)
+
+        x = x.to("cuda", dtype=torch.float32).contiguous()
+        self.context.set_input_shape(self.entrada, tuple(x.shape))
+        self.context.set_tensor_address(self.entrada, x.data_ptr())
+
+        salidas = []
+        for nombre in self.salidas:
+            buf = self._buffer(nombre, tuple(self.context.get_tensor_shape(nombre)))
+            self.context.set_tensor_address(nombre, buf.data_ptr())
+            salidas.append(buf)
+
+        # El engine corre en el stream actual de PyTorch (el stream compartido
+        # del pipeline), en orden con las copias y kernels de YOLO y EasyOCR
+        self.context.execute_async_v3(torch.cuda.current_stream().cuda_stream)
+
+        return salidas[0] if len(salidas) == 1 else tuple(salidas)
+
+    def eval(self):
+        # EasyOCR llama model.eval() antes de predecir; el engine no tiene modos
+        return self
+
+    def __getattr__(self, nombre):
+        # Cualquier otro atributo (parámetros, .module, etc.) se busca en el módulo original
+        if nombre == "modulo":
+            raise AttributeError(nombre)
+        return getattr(self.modulo, nombre)
 
 
 class PlateOCR:
@@ -25,15 +121,300 @@ class PlateOCR:
     - languages: lista de códigos de idioma para EasyOCR, por ejemplo ['en'] o ['es'].
                  Para matrículas suele bastar con 'en' porque se trata de caracteres
                  alfanuméricos (A-Z, 0-9).
+    - use_trt: si hay GPU y TensorRT, reemplaza el detector y el reconocedor por
+               engines FP16 (se compilan la primera vez y se guardan en model/).
+    - fast_gray: usa solo el canal verde como escala de grises (más barato que la
+                 suma ponderada de cvtColor y casi igual en placas monocromáticas).
+                 Con False se vuelve a cvtColor por si alguna placa se lee peor.
+    - int8_cpu: sin GPU, cuantiza a INT8 las capas Linear y LSTM del reconocedor
+                (aprox. el doble de rápido en CPU). Con False se queda en FP32.
     """
 
-    def __init__(self, languages=None):
+    # Perfiles (min, opt, max) de las entradas dinámicas de cada red.
+    # El detector recibe (N, 3, H, W); el reconocedor (N, 1, 64, W).
+    PERFIL_DETECTOR = ((1, 3, 32, 32), (1, 3, 256, 512), (1, 3, 1280, 1280))
+    PERFIL_RECONOCEDOR = ((1, 1, 64, 32), (1, 1, 64, 256), (8, 1, 64, 1024))
+
+    # Caracteres válidos en una placa
+    ALLOWLIST = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+    # Tabla para str.translate que borra todo carácter ASCII no alfanumérico
+    # (la limpieza corre en C en lugar de un ciclo de Python por carácter)
+    _DEL = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isalnum()))
+
+    # Ancho mínimo (px) al que se amplía el recorte antes del OCR
+    TARGET_W = 240
+
+    # Tamaño fijo (alto, ancho) de cada recorte en el OCR por lotes
+    BATCH_H, BATCH_W = 64, 256
+
+    def __init__(
+        self,
+        languages=None,
+        use_trt: bool = True,
+        fast_gray: bool = True,
+        int8_cpu: bool = True,
+    ):
         # Si no se especifican idiomas, usamos inglés por defecto (suficiente para placas)
         if languages is None:
             languages = ["en"]
 
+        # Con GPU las redes de EasyOCR corren en CUDA y cudnn_benchmark elige el
+        # kernel más rápido para cada tamaño de entrada.
+        self.use_cuda = torch.cuda.is_available()
+        self.device = "cuda" if self.use_cuda else "cpu"
+
+        self.fast_gray = fast_gray
+
+        # Buffers de preprocesamiento reutilizables (nombre -> arreglo uint8).
+        # Se reservan de nuevo solo cuando cambia el tamaño del recorte.
+        self._buffers = {}
+
         # Inicializamos el lector de EasyOCR con los idiomas deseados
-        self.reader = easyocr.Reader(languages)
+        self.reader = easyocr.Reader(
+            languages,
+            gpu=self.use_cuda,
+            cudnn_benchmark=self.use_cuda,
+            # La cuantización se hace abajo de forma explícita (int8_cpu)
+            quantize=False,
+        )
+
+        # En CPU el reconocedor (CRNN: convoluciones + LSTM + Linear) domina el
+        # tiempo del OCR. La cuantización dinámica pasa los pesos de LSTM y
+        # Linear a INT8 y usa GEMM enteras (AVX2/VNNI); las convoluciones
+        # no se ven afectadas.
+        if int8_cpu and not self.use_cuda:
+            self.reader.recognizer = torch.quantization.quantize_dynamic(
+                self.reader.recognizer,
+                {torch.nn.Linear, torch.nn.LSTM},
+                dtype=torch.qint8,
+            )
+
+        if use_trt and self.use_cuda and trt is not None:
+            try:
+                self._cargar_trt()
+            except Exception as e:
+                print(f"No se pudo usar TensorRT para el OCR, se sigue con PyTorch: {e}")
+
+        # Kernel gaussiano 1D (15 px, sigma por defecto de OpenCV) para la
+        # binarización adaptativa en GPU; se aplica separable en x y en y
+        if self.use_cuda:
+            g = torch.from_numpy(cv2.getGaussianKernel(15, 0).astype(np.float32).ravel())
+            self._gauss_x = g.view(1, 1, 1, 15).to(self.device)
+            self._gauss_y = g.view(1, 1, 15, 1).to(self.device)
+
+        # Índices de clase del reconocedor que no están en el allowlist (el 0 es el blank de CTC)
+        self._ignorar = [
+            i for i, ch in enumerate(self.reader.converter.character)
+            if i > 0 and ch not in PlateOCR.ALLOWLIST
+        ]
+
+        # Calentamiento: la primera inferencia reserva memoria y elige kernels,
+        # mejor pagarlo aquí que en el primer frame con placa
+        vacio = np.zeros((PlateOCR.BATCH_H, PlateOCR.BATCH_W), dtype=np.uint8)
+        self.read_plates_batch([vacio] * 8)
+
+    def _cargar_trt(self) -> None:
+        """
+        Reemplaza reader.detector y reader.recognizer por engines de TensorRT.
+
+        Los engines dependen de la arquitectura de la GPU, por eso el nombre
+        del archivo lleva la versión de cómputo (sm86, sm89, ...).
+        """
+        model_dir = Path(__file__).resolve().parent.parent / "model"
+        major, minor = torch.cuda.get_device_capability()
+        sm = f"sm{major}{minor}"
+
+        redes = [
+            ("detector", PlateOCR.PERFIL_DETECTOR, ["y", "feature"]),
+            ("recognizer", PlateOCR.PERFIL_RECONOCEDOR, ["preds"]),
+        ]
+        for nombre, perfil, salidas in redes:
+            modulo = getattr(self.reader, nombre)
+            # En GPU EasyOCR envuelve las redes en DataParallel
+            red = getattr(modulo, "module", modulo).eval()
+
+            engine_path = model_dir / f"ocr_{nombre}_{sm}_fp16.engine"
+            if not engine_path.exists():
+                onnx_path = model_dir / f"ocr_{nombre}.onnx"
+                if not onnx_path.exists():
+                    if nombre == "recognizer":
+                        red = _SoloImagen(red)
+                    ejemplo = torch.zeros(perfil[1], device="cuda")
+                    ejes = {0: "n", 3: "w"} if nombre == "recognizer" else {0: "n", 2: "h", 3: "w"}
+                    torch.onnx.export(
+                        red, (ejemplo,), str(onnx_path),
+                        input_names=["x"], output_names=salidas,
+                        dynamic_axes={"x": ejes}, opset_version=17,
+                    )
+                PlateOCR._build_trt(onnx_path, engine_path, perfil)
+
+            setattr(self.reader, nombre, _MotorTRT(engine_path, modulo, perfil))
+
+    @staticmethod
+    def _build_trt(onnx_path, engine_path, perfil) -> None:
+        """Compila un modelo ONNX a un engine FP16 de TensorRT y lo guarda en disco."""
+        logger = trt.Logger(trt.Logger.WARNING)
+        builder = trt.Builder(logger)
+        network = builder.create_network(
+            1 << int(trt.NetworkDefinitionCreationFlag.EXPLICIT_BATCH)
+        )
+        parser = trt.OnnxParser(network, logger)
+        with open(onnx_path, "rb") as f:
+            if not parser.parse(f.read()):
+                errores = [str(parser.get_error(i)) for i in range(parser.num_errors)]
+                raise RuntimeError(f"Error al leer {onnx_path}: {errores}")
+
+        config = builder.create_builder_config()
+        config.set_flag(trt.BuilderFlag.FP16)
+        profile = builder.create_optimization_profile()
+        profile.set_shape(network.get_input(0).name, *perfil)
+        config.add_optimization_profile(profile)
+
+        serializado = builder.build_serialized_network(network, config)
+        if serializado is None:
+            raise RuntimeError(f"TensorRT no pudo compilar {onnx_path}")
+        with open(engine_path, "wb") as f:
+            f.write(serializado)
+
+    def _buffer(self, nombre, forma):
+        """Devuelve el buffer uint8 `nombre` con la forma pedida, reutilizándolo si ya existe."""
+        buf = self._buffers.get(nombre)
+        if buf is None or buf.shape != forma:
+            buf = np.empty(forma, dtype=np.uint8)
+            self._buffers[nombre] = buf
+        return buf
+
+    def preprocess(self, plate_image_bgr):
+        """
+        Preprocesa el recorte de la placa para el OCR: escala de grises,
+        ampliación (solo si el recorte es angosto) y binarización adaptativa.
+        Devuelve la imagen binaria.
+
+        El resultado vive en un buffer interno que se sobrescribe en la siguiente
+        llamada; quien lo necesite conservar debe copiarlo (prepare_batch_item
+        ya devuelve un arreglo nuevo).
+        """
+        h, w = plate_image_bgr.shape[:2]
+
+        # Convertimos a escala de grises (reducción de canales y ruido de color).
+        # Con fast_gray se toma el canal verde, que carga casi toda la luminancia.
+        gray = self._buffer("gray", (h, w))
+        if self.fast_gray:
+            cv2.extractChannel(plate_image_bgr, 1, dst=gray)
+        else:
+            cv2.cvtColor(plate_image_bgr, cv2.COLOR_BGR2GRAY, dst=gray)
+
+        # Ampliamos solo hasta un ancho mínimo: en recortes que ya son grandes
+        # la ampliación no mejora la lectura y solo agrega píxeles al OCR
+        scale = max(1.0, PlateOCR.TARGET_W / w)
+        if scale == 1.0:
+            thresh = gray
+        else:
+            new_w, new_h = round(w * scale), round(h * scale)
+            thresh = self._buffer("thresh", (new_h, new_w))
+            cv2.resize(
+                gray, (new_w, new_h), dst=thresh, interpolation=cv2.INTER_LINEAR
+            )
+
+        # Binarización adaptativa en una sola pasada: cada píxel se compara con
+        # el promedio gaussiano de su vecindario (15x15) menos 8, lo que tolera
+        # iluminación desigual mejor que un umbral global
+        cv2.adaptiveThreshold(
+            thresh, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 15, 8,
+            dst=thresh,
+        )
+        return thresh
+
+    def prepare_batch_item(self, plate_image_bgr):
+        """
+        Preprocesa un recorte y lo lleva al tamaño fijo del lote (64 x 256).
+
+        Devuelve un arreglo nuevo, así el recorte original del frame se puede
+        soltar aunque el elemento quede esperando en el buffer del lote.
+        """
+        thresh = self.preprocess(plate_image_bgr)
+        return cv2.resize(
+            thresh, (PlateOCR.BATCH_W, PlateOCR.BATCH_H), interpolation=cv2.INTER_AREA
+        )
+
+    def prepare_batch_item_gpu(self, plate_crop_gpu):
+        """
+        Versión en GPU de prepare_batch_item para un recorte que ya está en CUDA
+        (vista de PlateDetector.last_gpu_frame, uint8 HxWx3 BGR).
+
+        Hace los mismos pasos que preprocess con operaciones de PyTorch: canal
+        verde (o luminancia), ampliación al ancho mínimo, umbral adaptativo
+        gaussiano 15x15 con C=8 y reducción por área a 64 x 256. El resultado
+        (tensor float en [0, 255]) no sale de la GPU.
+        """
+        x = plate_crop_gpu.permute(2, 0, 1).unsqueeze(0).float()  # 1x3xHxW BGR
+        if self.fast_gray:
+            gray = x[:, 1:2]
+        else:
+            gray = 0.114 * x[:, 0:1] + 0.587 * x[:, 1:2] + 0.299 * x[:, 2:3]
+
+        h, w = gray.shape[2:]
+        scale = max(1.0, PlateOCR.TARGET_W / w)
+        if scale != 1.0:
+            gray = F.interpolate(
+                gray, size=(round(h * scale), round(w * scale)),
+                mode="bilinear", align_corners=False,
+            )
+
+        # Umbral adaptativo: promedio gaussiano del vecindario (borde replicado)
+        mean = F.pad(gray, (7, 7, 7, 7), mode="replicate")
+        mean = F.conv2d(F.conv2d(mean, self._gauss_x), self._gauss_y)
+        thresh = (gray > mean - 8).float().mul_(255.0)
+
+        thresh = F.interpolate(
+            thresh, size=(PlateOCR.BATCH_H, PlateOCR.BATCH_W), mode="area"
+        )
+        return thresh[0, 0]
+
+    def read_plates_batch(self, items) -> list[str | None]:
+        """
+        Lee varias placas con una sola pasada del reconocedor de EasyOCR.
+
+        Parámetros:
+        - items: lista de imágenes de 64 x 256 en escala de grises
+                 (salida de prepare_batch_item, o tensores en GPU de
+                 prepare_batch_item_gpu; se pueden mezclar).
+
+        A diferencia de read_plate no corre el detector de texto: cada recorte
+        ya es la placa completa, así que va directo al reconocedor.
+
+        Retorno:
+        - Lista con el texto de cada placa (igual que read_plate), o None
+          en las posiciones donde no se leyó nada.
+        """
+        if not items:
+            return []
+
+        # (N, 1, 64, 256) normalizado a [-1, 1], igual que lo hace EasyOCR.
+        # Los elementos que ya están en GPU no pasan por la CPU.
+        lote = [
+            item if isinstance(item, torch.Tensor) else torch.from_numpy(item)
+            for item in items
+        ]
+        x = torch.stack([t.to(self.device).float() for t in lote])[:, None]
+        x = x.div_(127.5).sub_(1.0)
+
+        with torch.no_grad():
+            # El segundo argumento (texto) el reconocedor no lo usa al predecir
+            preds = self.reader.recognizer(x, None)
+
+        # Decodificación CTC voraz descartando los caracteres fuera del allowlist
+        preds[:, :, self._ignorar] = float("-inf")
+        indices = preds.argmax(2).cpu().numpy()
+        longitudes = [indices.shape[1]] * indices.shape[0]
+        textos = self.reader.converter.decode_greedy(indices.reshape(-1), longitudes)
+
+        placas = []
+        for raw_text in textos:
+            plate_text = raw_text.upper().translate(PlateOCR._DEL)
+            placas.append(plate_text if plate_text else None)
+        return placas
 
     def read_plate(self, plate_image_bgr) -> str | None:
         """
@@ -45,8 +426,8 @@ class PlateOCR:
 
         Flujo:
         1. Convierte la imagen a escala de grises.
-        2. Aumenta el tamaño para facilitar el reconocimiento.
-        3. Aplica un suavizado y umbralización para resaltar el contraste.
+        2. Aumenta el tamaño (si el recorte es angosto) para facilitar el reconocimiento.
+        3. Aplica una umbralización adaptativa para resaltar el contraste.
         4. Ejecuta EasyOCR con un allowlist limitado a A-Z y 0-9.
         5. Une los fragmentos de texto detectados y limpia caracteres no alfanuméricos.
 
@@ -57,26 +438,13 @@ class PlateOCR:
         if plate_image_bgr is None:
             return None
 
-        # Convertimos a escala de grises (reducción de canales y ruido de color)
-        gray = cv2.cvtColor(plate_image_bgr, cv2.COLOR_BGR2GRAY)
-
-        # Aumentamos el tamaño para mejorar la lectura del OCR
-        scale = 2.0
-        gray = cv2.resize(
-            gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC
-        )
-
-        # Suavizado + binarización (umbral adaptativo por Otsu)
-        gray = cv2.GaussianBlur(gray, (3, 3), 0)
-        _, thresh = cv2.threshold(
-            gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU
-        )
+        thresh = self.preprocess(plate_image_bgr)
 
         # OCR con allowlist: restringimos a caracteres típicos de placas
         textos = self.reader.readtext(
             thresh,
             detail=0,  # detail=0 → solo texto, no bounding boxes
-            allowlist="ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+            allowlist=PlateOCR.ALLOWLIST,
         )
 
         if not textos:
@@ -86,6 +454,6 @@ class PlateOCR:
         raw_text = "".join(textos)
 
         # Normalizamos: quedarnos solo con caracteres alfanuméricos en mayúsculas
-        plate_text = "".join(ch for ch in raw_text.upper() if ch.isalnum())
+        plate_text = raw_text.upper().translate(PlateOCR._DEL)
 
         return plate_text if plate_text else None
@@ -7,6 +7,10 @@ para obtener la información de un vehículo y su propietario a partir
 del texto de la placa detectada por el sistema de visión + OCR.
 """
 
+import functools
+
+from MySQLdb import Error
+
 from Db_conector import MySQLDatabase
 
 
@@ -19,6 +23,44 @@ class SearchVehicle:
     Se apoya en MySQLDatabase para ejecutar las consultas SQL.
     """
 
+    # Consulta SQL: ajusta los nombres de columnas/tablas a tu esquema real.
+    # Es fija, así que se arma una sola vez para toda la clase.
+    OWNER_BY_PLATE_QUERY = """
+        SELECT 
+            v.placa,
+            v.marca,
+            v.modelo,
+            v.anio,
+            p.id_propietario,
+            p.nombre,
+            p.telefono,
+            p.email
+        FROM vehiculos v
+        JOIN propietarios p ON v.id_propietario = p.id_propietario
+        -- placa_norm ya guarda la placa sin espacios y en mayúsculas (columna
+        -- generada con índice), así la búsqueda usa el índice en lugar de
+        -- recorrer toda la tabla aplicando REPLACE(UPPER(...)) a cada fila
+        WHERE v.placa_norm = %s
+    """
+
+    # Migración para bases creadas antes de la columna placa_norm
+    # (database/placas_db.sql ya la incluye). Se aplica una sola vez con migrate().
+    PLACA_NORM_MIGRATION = """
+        ALTER TABLE vehiculos
+            ADD COLUMN placa_norm VARCHAR(15)
+                AS (REPLACE(UPPER(placa), ' ', '')) STORED,
+            ADD INDEX idx_placa_norm (placa_norm)
+    """
+
+    # ¿La tabla vehiculos de la base actual ya tiene la columna placa_norm?
+    PLACA_NORM_EXISTS_QUERY = """
+        SELECT 1
+        FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE()
+          AND TABLE_NAME = 'vehiculos'
+          AND COLUMN_NAME = 'placa_norm'
+    """
+
     def __init__(self, db: MySQLDatabase):
         """
         Constructor.
@@ -29,6 +71,50 @@ class SearchVehicle:
         """
         self.db = db
 
+        # Caché LRU por placa normalizada: una placa que se repite (el mismo auto
+        # frente a la cámara) no vuelve a consultar MySQL. Si la consulta falla
+        # se lanza la excepción y lru_cache no guarda nada
+        self._cached_lookup = functools.lru_cache(maxsize=1024)(self._query_owner)
+
+    def migrate(self) -> None:
+        """
+        Agrega la columna generada placa_norm y su índice a la tabla vehiculos.
+
+        Solo hace falta en una base creada con una versión anterior del script
+        SQL; si la columna ya existe, MySQL reporta el error y no cambia nada.
+        """
+        self.db.execute_non_query(SearchVehicle.PLACA_NORM_MIGRATION)
+        self.clear_cache()
+
+    def ensure_schema(self) -> None:
+        """
+        Revisa que exista la columna placa_norm (la usa OWNER_BY_PLATE_QUERY)
+        y, si falta, aplica migrate(). Se llama una vez al iniciar, así una base
+        importada con el script SQL anterior sigue funcionando.
+        """
+        try:
+            exists = self.db.execute_query(
+                SearchVehicle.PLACA_NORM_EXISTS_QUERY, raise_errors=True
+            )
+        except Error as e:
+            print(f"No se pudo revisar el esquema de la BD: {e}")
+            return
+
+        if not exists:
+            print("Falta la columna vehiculos.placa_norm; aplicando migración...")
+            self.migrate()
+
+    def clear_cache(self) -> None:
+        """Olvida las búsquedas guardadas (por ejemplo, tras modificar la BD)."""
+        self._cached_lookup.cache_clear()
+
+    def _query_owner(self, normalized_plate: str):
+        """Ejecuta la consulta para una placa ya normalizada (lanza Error si falla)."""
+        results = self.db.execute_query(
+            SearchVehicle.OWNER_BY_PLATE_QUERY, (normalized_plate,), raise_errors=True
+        )
+        return results[0] if results else None
+
     def find_owner_by_plate(self, plate: str):
         """
         Busca en la base de datos la información del vehículo y propietario
@@ -47,6 +133,11 @@ class SearchVehicle:
         - Diccionario con datos de vehículo y propietario (placa, marca, modelo, año,
           nombre, teléfono, email).
         - None si no se encontró ningún registro.
+
+        Los resultados (incluido "no encontrada") se guardan en caché; usa
+        clear_cache() si la tabla cambia mientras el programa corre. Si la
+        consulta falla se devuelve None sin guardarlo, y la siguiente vez se
+        vuelve a consultar.
         """
         if not plate:
             return None
@@ -54,22 +145,30 @@ class SearchVehicle:
         # Normalizamos: sin espacios y en mayúsculas
         normalized_plate = plate.strip().upper().replace(" ", "")
 
-        # Consulta SQL: ajusta los nombres de columnas/tablas a tu esquema real
-        query = """
-            SELECT 
-                v.placa,
-                v.marca,
-                v.modelo,
-                v.anio,
-                p.id_propietario,
-                p.nombre,
-                p.telefono,
-                p.email
-            FROM vehiculos v
-            JOIN propietarios p ON v.id_propietario = p.id_propietario
-            -- REPLACE y UPPER para comparar independientemente de espacios o mayúsculas
-            WHERE REPLACE(UPPER(v.placa), ' ', '') = %s
+        try:
+            return self._cached_lookup(normalized_plate)
+        except Error as e:
+            print(f"Error al ejecutar la consulta: {e}")
+            return None
+
+    async def find_owner_by_plate_async(self, plate: str):
+        """
+        Igual que find_owner_by_plate pero sin bloquear: usa el pool asíncrono
+        de MySQLDatabase (connect_async). No pasa por la caché LRU: quien la
+        llama (WebcamPipeline) ya evita consultar dos veces seguidas la misma placa.
+
+        Retorno:
+        - Diccionario con datos de vehículo y propietario, o None si no existe.
+        - Si la consulta falla se propaga la excepción, para que quien llama no
+          la confunda con una placa que no existe.
         """
+        if not plate:
+            return None
+
+        # Normalizamos: sin espacios y en mayúsculas
+        normalized_plate = plate.strip().upper().replace(" ", "")
 
-        results = self.db.execute_query(query, (normalized_plate,))
+        results = await self.db.execute_query_async(
+            SearchVehicle.OWNER_BY_PLATE_QUERY, (normalized_plate,), raise_errors=True
+        )
         return results[0] if results else None